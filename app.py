@@ -5,20 +5,46 @@ import joblib
 import os
 from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
+from fast_vectorizer import build_fast_vectorizer
+from low_memory import compact_model, compact_vectorizer, decode_labels, fake_column
+from ensemble import ENSEMBLE_FILE
 
 print("🔍 AI FAKE NEWS DETECTOR")
 print("=" * 50)
 
 class FakeNewsDetector:
-    def __init__(self):
+    # Manual rule-based checks used by analyze_text
+    FAKE_INDICATORS = ['breaking', 'shocking', 'conspiracy', 'secret', 'hoax', 
+                       'rumor', 'viral', 'exposed', 'miracle', '100%']
+    
+    TRUSTED_SOURCES = ['bbc', 'reuters', 'associated press', 'official', 
+                       'research', 'study', 'report']
+    
+    def __init__(self, low_memory=False, ensemble=False):
         self.model = None
         self.vectorizer = None
+        self.fast_vectorizer = None
+        self.low_memory = low_memory
+        self.ensemble = ensemble
+        # Optional DriftMonitor fed by predict_batch and analyze_text
+        self.monitor = None
         self.load_model()
+        if low_memory and self.model is not None:
+            # float32 features and weights, labels as integer codes
+            compact_vectorizer(self.vectorizer)
+            compact_model(self.model)
+        self.fast_vectorizer = build_fast_vectorizer(self.vectorizer)
     
     def load_model(self):
         """Load trained AI model"""
         try:
-            if os.path.exists('fake_news_model.pkl') and os.path.exists('vectorizer.pkl'):
+            if self.ensemble and os.path.exists(ENSEMBLE_FILE):
+                print("📂 Loading AI ensemble...")
+                artifact = joblib.load(ENSEMBLE_FILE)
+                self.model = artifact['model']
+                self.vectorizer = artifact['vectorizer']
+                print(f"✅ Ensemble loaded: {', '.join(self.model.member_names)}")
+            elif not self.ensemble and os.path.exists('fake_news_model.pkl') and os.path.exists('vectorizer.pkl'):
                 print("📂 Loading AI model...")
                 self.model = joblib.load('fake_news_model.pkl')
                 self.vectorizer = joblib.load('vectorizer.pkl')
@@ -34,20 +60,45 @@ class FakeNewsDetector:
         """Train a new model if not exists"""
         try:
             from train_model import train_fake_news_model
-            self.model, self.vectorizer = train_fake_news_model()
+            self.model, self.vectorizer = train_fake_news_model(low_memory=self.low_memory,
+                                                                ensemble=self.ensemble)
         except:
             print("❌ Could not train model. Please check dataset.csv")
     
+    def transform(self, texts):
+        """Convert a batch of texts to TF-IDF features"""
+        if self.fast_vectorizer is not None:
+            return self.fast_vectorizer.transform(texts)
+        return self.vectorizer.transform(texts)
+    
+    def predict_batch(self, texts):
+        """Predict a batch of texts, returns (predictions, confidences)"""
+        if self.model is None or self.vectorizer is None:
+            return ["Model not available"] * len(texts), np.zeros(len(texts))
+        
+        text_features = self.transform(texts)
+        probabilities = self.model.predict_proba(text_features)
+        predictions = decode_labels(self.model.classes_[probabilities.argmax(axis=1)])
+        if self.monitor is not None:
+            self.monitor.observe(texts, probabilities[:, fake_column(self.model.classes_)])
+        
+        return predictions, probabilities.max(axis=1)
+    
+    def predict_fake_proba(self, texts):
+        """Return the probability of being fake for a batch of texts"""
+        probabilities = self.model.predict_proba(self.transform(texts))
+        return probabilities[:, fake_column(self.model.classes_)]
+    
     def predict_news(self, text):
         """Predict if news is real or fake"""
         if self.model is None or self.vectorizer is None:
             return "Model not available", 0
         
         # Convert text to features
-        text_features = self.vectorizer.transform([text])
+        text_features = self.transform([text])
         
         # Make prediction
-        prediction = self.model.predict(text_features)[0]
+        prediction = decode_labels(self.model.predict(text_features))[0]
         probability = self.model.predict_proba(text_features)[0]
         
         # Get confidence score
@@ -60,14 +111,11 @@ class FakeNewsDetector:
         prediction, confidence = self.predict_news(text)
         
         # Manual rule-based checks (for educational purposes)
-        fake_indicators = ['breaking', 'shocking', 'conspiracy', 'secret', 'hoax', 
-                          'rumor', 'viral', 'exposed', 'miracle', '100%']
-        
-        trusted_sources = ['bbc', 'reuters', 'associated press', 'official', 
-                          'research', 'study', 'report']
-        
-        detected_indicators = [word for word in fake_indicators if word in text.lower()]
-        trusted_mentioned = any(source in text.lower() for source in trusted_sources)
+        detected_indicators = [word for word in self.FAKE_INDICATORS if word in text.lower()]
+        trusted_mentioned = any(source in text.lower() for source in self.TRUSTED_SOURCES)
+        if self.monitor is not None and self.model is not None:
+            fake_probability = confidence if prediction == 'fake' else 1 - confidence
+            self.monitor.observe([text], [fake_probability], indicators=[detected_indicators])
         
         return {
             'prediction': prediction,
@@ -153,7 +201,10 @@ def main():
         
         elif choice == '3':
             print("\n📊 MODEL INFORMATION:")
-            print("Algorithm: Logistic Regression")
+            if detector.ensemble:
+                print(f"Algorithm: Ensemble ({', '.join(detector.model.member_names)})")
+            else:
+                print("Algorithm: Logistic Regression")
             print("Features: TF-IDF Vectorization")
             print("Training: Supervised Machine Learning")
             print("Accuracy: ~85-90% (on sample data)")
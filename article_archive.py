@@ -0,0 +1,320 @@
+# article_archive.py
+# OFFSET-INDEXED, MEMORY-MAPPED ARTICLE ARCHIVE
+#
+# File layout (little endian):
+#   header   64 bytes, see HEADER below
+#   data     article texts as UTF-8 back to back, or zlib blocks of
+#            block_size articles each when compressed
+#   index    uncompressed: uint64 offsets[count + 1] into the data region
+#            compressed:   uint64 block_offsets[n_blocks + 1], then uint64
+#                          offsets inside each decompressed block, block_size + 1
+#                          per block (fewer for the last one)
+#   labels   uint8 label code per article (255 = no label), optional
+#   meta     JSON with the label names
+import json
+import mmap
+import struct
+import zlib
+from array import array
+
+import numpy as np
+
+ARCHIVE_SUFFIX = '.newsarc'
+MAGIC = b'NEWSARC1'
+HEADER = struct.Struct('<8sIIQIIQQQQ')
+NO_LABEL = 255
+FLAG_COMPRESSED = 1
+FLAG_LABELS = 2
+
+
+class ArticleArchiveWriter:
+    """Append articles to a new archive file
+
+    With block_size set, every block_size articles are zlib-compressed
+    together; reading one article then decompresses only its block.
+    """
+
+    def __init__(self, path, block_size=0, label_names=('real', 'fake')):
+        self.path = path
+        self.block_size = block_size
+        self.label_names = list(label_names)
+        self._label_codes = {name: code for code, name in enumerate(self.label_names)}
+        self._file = open(path, 'wb')
+        self._file.write(b'\0' * HEADER.size)
+        self._data_start = HEADER.size
+        self._offsets = array('Q', [0])
+        self._block_offsets = array('Q', [0])
+        self._block = []
+        self._labels = array('B')
+        self._has_labels = False
+        self.count = 0
+
+    def append(self, text, label=None):
+        """Add one article, returns its id"""
+        encoded = text.encode('utf-8')
+        if label is None:
+            self._labels.append(NO_LABEL)
+        else:
+            self._has_labels = True
+            self._labels.append(self._label_codes[label])
+
+        if self.block_size:
+            if not self._block:
+                self._offsets.append(0)
+            self._block.append(encoded)
+            self._offsets.append(self._offsets[-1] + len(encoded))
+            if len(self._block) == self.block_size:
+                self._flush_block()
+        else:
+            self._file.write(encoded)
+            self._offsets.append(self._offsets[-1] + len(encoded))
+
+        self.count += 1
+        return self.count - 1
+
+    def extend(self, texts, labels=None):
+        labels = labels if labels is not None else [None] * len(texts)
+        for text, label in zip(texts, labels):
+            self.append(text, label)
+
+    def _flush_block(self):
+        compressed = zlib.compress(b''.join(self._block))
+        self._file.write(compressed)
+        self._block_offsets.append(self._block_offsets[-1] + len(compressed))
+        self._block = []
+
+    def close(self):
+        if self._file is None:
+            return
+        if self._block:
+            self._flush_block()
+
+        index_offset = self._file.tell()
+        if self.block_size:
+            # The first entry is the placeholder from __init__, each block adds its own 0
+            self._block_offsets.tofile(self._file)
+            self._offsets[1:].tofile(self._file)
+        else:
+            self._offsets.tofile(self._file)
+
+        labels_offset = 0
+        if self._has_labels:
+            labels_offset = self._file.tell()
+            self._labels.tofile(self._file)
+
+        meta_offset = self._file.tell()
+        meta = json.dumps({'labels': self.label_names}).encode('utf-8')
+        self._file.write(meta)
+
+        flags = (FLAG_COMPRESSED if self.block_size else 0) | (FLAG_LABELS if self._has_labels else 0)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, 1, flags, self.count, self.block_size, len(meta),
+                                     self._data_start, index_offset, labels_offset, meta_offset))
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArticleArchive:
+    """Random access to the articles of an archive through mmap
+
+    archive[i] returns one text and archive[i:j] a list of texts, without
+    reading anything else from the file.
+    """
+
+    def __init__(self, path, cache_blocks=8):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, flags, count, block_size, meta_length,
+         data_offset, index_offset, labels_offset, meta_offset) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an article archive")
+        if version != 1:
+            raise ValueError(f"Unsupported archive version {version}")
+
+        self.count = count
+        self.block_size = block_size
+        self.compressed = bool(flags & FLAG_COMPRESSED)
+        self._data_offset = data_offset
+        meta = json.loads(self._mmap[meta_offset:meta_offset + meta_length])
+        self.label_names = meta['labels']
+
+        if self.compressed:
+            n_blocks = -(-count // block_size)
+            self._block_offsets = np.frombuffer(self._mmap, dtype='<u8',
+                                                count=n_blocks + 1, offset=index_offset)
+            self._offsets = np.frombuffer(self._mmap, dtype='<u8', count=count + n_blocks,
+                                          offset=index_offset + 8 * (n_blocks + 1))
+        else:
+            self._offsets = np.frombuffer(self._mmap, dtype='<u8', count=count + 1,
+                                          offset=index_offset)
+
+        self._label_codes = None
+        if flags & FLAG_LABELS:
+            self._label_codes = np.frombuffer(self._mmap, dtype=np.uint8, count=count,
+                                              offset=labels_offset)
+
+        self._cache_blocks = cache_blocks
+        self._blocks = {}
+
+    def __len__(self):
+        return self.count
+
+    def _block(self, block):
+        data = self._blocks.get(block)
+        if data is None:
+            start = self._data_offset + int(self._block_offsets[block])
+            end = self._data_offset + int(self._block_offsets[block + 1])
+            data = zlib.decompress(self._mmap[start:end])
+            if len(self._blocks) >= self._cache_blocks:
+                self._blocks.pop(next(iter(self._blocks)))
+            self._blocks[block] = data
+        return data
+
+    def get(self, article_id):
+        """Return the text of one article"""
+        if article_id < 0:
+            article_id += self.count
+        if not 0 <= article_id < self.count:
+            raise IndexError(f"Article id {article_id} out of range")
+
+        if self.compressed:
+            block, position = divmod(article_id, self.block_size)
+            slot = block * (self.block_size + 1) + position
+            data = self._block(block)
+            return data[int(self._offsets[slot]):int(self._offsets[slot + 1])].decode('utf-8')
+
+        start = self._data_offset + int(self._offsets[article_id])
+        end = self._data_offset + int(self._offsets[article_id + 1])
+        return self._mmap[start:end].decode('utf-8')
+
+    def get_range(self, start, stop):
+        """Return the texts of articles start..stop-1"""
+        start, stop, _ = slice(start, stop).indices(self.count)
+        if self.compressed or stop <= start:
+            return [self.get(i) for i in range(start, stop)]
+        # One contiguous read for the whole range, split on the offsets
+        offsets = (self._offsets[start:stop + 1] - self._offsets[start]).tolist()
+        base = self._data_offset + int(self._offsets[start])
+        data = self._mmap[base:base + offsets[-1]]
+        return [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(stop - start)]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                return [self.get(i) for i in range(*key.indices(self.count))]
+            return self.get_range(key.start, key.stop)
+        return self.get(key)
+
+    def __iter__(self):
+        for start in range(0, self.count, 1024):
+            yield from self.get_range(start, start + 1024)
+
+    def label(self, article_id):
+        """Return the label of one article, or None"""
+        if self._label_codes is None:
+            return None
+        code = int(self._label_codes[article_id])
+        return None if code == NO_LABEL else self.label_names[code]
+
+    def labels(self, start=0, stop=None):
+        """Return labels for a range of articles as an object array (None if missing)"""
+        start, stop, _ = slice(start, stop).indices(self.count)
+        names = np.array(self.label_names + [None], dtype=object)
+        if self._label_codes is None:
+            return np.full(stop - start, None, dtype=object)
+        codes = self._label_codes[start:stop].astype(np.intp)
+        codes[codes == NO_LABEL] = len(self.label_names)
+        return names[codes]
+
+    def close(self):
+        if self._mmap is None:
+            return
+        # numpy views keep the mmap buffer exported, drop them before closing
+        self._offsets = self._block_offsets = self._label_codes = None
+        self._blocks = {}
+        self._mmap.close()
+        self._file.close()
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_archive(path):
+    return str(path).endswith(ARCHIVE_SUFFIX)
+
+
+def build_from_csv(csv_path, archive_path, block_size=0, chunksize=10000):
+    """Convert a CSV with 'text' (and optionally 'label') columns into an archive"""
+    import pandas as pd
+    with ArticleArchiveWriter(archive_path, block_size=block_size) as writer:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            labels = None
+            if 'label' in chunk:
+                # Blank label cells are stored as NO_LABEL
+                labels = [None if pd.isna(label) else label for label in chunk['label']]
+            writer.extend(chunk['text'].fillna('').astype(str).tolist(), labels)
+        return writer.count
+
+
+def score_archive(detector, archive, start=0, stop=None, batch_size=1024):
+    """Yield (article_id, prediction, confidence) for a range of an archive"""
+    start, stop, _ = slice(start, stop).indices(len(archive))
+    for batch_start in range(start, stop, batch_size):
+        batch_stop = min(batch_start + batch_size, stop)
+        predictions, confidences = detector.predict_batch(archive.get_range(batch_start, batch_stop))
+        yield from zip(range(batch_start, batch_stop), predictions, confidences)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build and read article archives")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="convert a CSV into an archive")
+    build.add_argument('csv')
+    build.add_argument('archive')
+    build.add_argument('--block-size', type=int, default=0,
+                       help="articles per compressed block (0 = uncompressed)")
+
+    show = commands.add_parser('get', help="print one article")
+    show.add_argument('archive')
+    show.add_argument('article_id', type=int)
+
+    score = commands.add_parser('score', help="score a range of articles")
+    score.add_argument('archive')
+    score.add_argument('--start', type=int, default=0)
+    score.add_argument('--stop', type=int)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        count = build_from_csv(args.csv, args.archive, block_size=args.block_size)
+        print(f"💾 Archived {count} articles to '{args.archive}'")
+
+    elif args.command == 'get':
+        with ArticleArchive(args.archive) as archive:
+            print(f"📰 Article #{args.article_id} ({archive.label(args.article_id) or 'no label'}):")
+            print(archive[args.article_id])
+
+    elif args.command == 'score':
+        from app import FakeNewsDetector
+        detector = FakeNewsDetector()
+        if detector.model is None:
+            raise SystemExit(1)
+        with ArticleArchive(args.archive) as archive:
+            for article_id, prediction, confidence in score_archive(detector, archive,
+                                                                    args.start, args.stop):
+                print(f"#{article_id}\t{prediction}\t{confidence * 100:.1f}%")
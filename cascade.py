@@ -0,0 +1,219 @@
+# cascade.py
+# TIERED CASCADE: CHEAP RULE SCREENING FIRST, ML MODEL ONLY WHEN UNSURE
+import json
+import time
+
+import numpy as np
+
+from fake_news_detector.news_rules import rule_fake_probabilities
+
+THRESHOLDS_FILE = 'cascade_thresholds.json'
+
+
+class CascadeDetector:
+    """Run the weighted rules first and the ML model only for the uncertain middle band.
+
+    Articles whose rule fake probability is at or above fake_threshold are
+    reported as fake, at or below real_threshold as real. Everything in
+    between goes to the TF-IDF + logistic regression detector. Thresholds
+    use the same 0-100 scale as advanced_news_detection.
+    """
+
+    TIERS = ('rules_fake', 'rules_real', 'model')
+
+    def __init__(self, detector, fake_threshold=80, real_threshold=20):
+        if real_threshold >= fake_threshold:
+            raise ValueError("real_threshold must be below fake_threshold")
+        self.detector = detector
+        self.fake_threshold = fake_threshold
+        self.real_threshold = real_threshold
+        self.tier_counts = dict.fromkeys(self.TIERS, 0)
+
+    @classmethod
+    def from_file(cls, detector, path=THRESHOLDS_FILE):
+        """Create a cascade with thresholds saved by calibrate_thresholds"""
+        with open(path) as f:
+            thresholds = json.load(f)
+        return cls(detector, thresholds['fake_threshold'], thresholds['real_threshold'])
+
+    def rule_tier(self, text, title=""):
+        """Return (prediction or None, rule fake probability)"""
+        fake_probability = float(rule_fake_probabilities([title], [text])[0])
+        if fake_probability >= self.fake_threshold:
+            return 'fake', fake_probability
+        if fake_probability <= self.real_threshold:
+            return 'real', fake_probability
+        return None, fake_probability
+
+    def analyze_batch(self, texts, titles=None):
+        """Classify a batch, sending only undecided articles to the model"""
+        titles = titles if titles is not None else [""] * len(texts)
+        results = []
+        undecided = []
+
+        # One screening pass over the whole batch
+        for i, fake_probability in enumerate(rule_fake_probabilities(titles, texts).tolist()):
+            if fake_probability >= self.fake_threshold:
+                prediction, tier = 'fake', 'rules_fake'
+            elif fake_probability <= self.real_threshold:
+                prediction, tier = 'real', 'rules_real'
+            else:
+                undecided.append(i)
+                results.append(None)
+                continue
+            self.tier_counts[tier] += 1
+            confidence = fake_probability if prediction == 'fake' else 100 - fake_probability
+            results.append({
+                'prediction': prediction,
+                'confidence': confidence / 100,
+                'rule_probability': fake_probability,
+                'tier': tier
+            })
+
+        if undecided:
+            predictions, confidences = self.detector.predict_batch([texts[i] for i in undecided])
+            for i, prediction, confidence in zip(undecided, predictions, confidences):
+                results[i] = {
+                    'prediction': prediction,
+                    'confidence': confidence,
+                    'rule_probability': None,
+                    'tier': 'model'
+                }
+            self.tier_counts['model'] += len(undecided)
+
+        return results
+
+    def analyze_text(self, text, title=""):
+        """Classify a single article"""
+        return self.analyze_batch([text], [title])[0]
+
+    def hit_rates(self):
+        """Fraction of articles settled by each tier so far"""
+        total = sum(self.tier_counts.values())
+        if total == 0:
+            return dict.fromkeys(self.TIERS, 0.0)
+        return {tier: count / total for tier, count in self.tier_counts.items()}
+
+    def reset_stats(self):
+        self.tier_counts = dict.fromkeys(self.TIERS, 0)
+
+
+def calibrate_thresholds(detector, texts, target_agreement=0.98, titles=None):
+    """Pick rule thresholds that send the fewest articles to the model.
+
+    Agreement is measured against the full pipeline (the model prediction
+    for every article). Of all threshold pairs whose cascade agrees with it
+    on at least target_agreement of texts, the one with the most early exits
+    is returned.
+    """
+    titles = titles if titles is not None else [""] * len(texts)
+    rule_probs = rule_fake_probabilities(titles, texts)
+    full_predictions, _ = detector.predict_batch(list(texts))
+    full_fake = np.asarray(full_predictions) == 'fake'
+    n = len(rule_probs)
+
+    # Per distinct rule probability: how many articles, how many the model calls fake
+    values, position = np.unique(rule_probs, return_inverse=True)
+    count_at = np.bincount(position, minlength=len(values))
+    fake_at = np.bincount(position, weights=full_fake, minlength=len(values)).astype(int)
+    real_at = count_at - fake_at
+
+    # Real threshold values[j] settles everything <= values[j]; errors are model-fake
+    real_exits = np.cumsum(count_at)
+    real_errors = np.cumsum(fake_at)
+    # Fake threshold values[k] settles everything >= values[k]; errors are model-real.
+    # Index len(values) means no fake exits at all.
+    fake_exits = np.append(np.cumsum(count_at[::-1])[::-1], 0)
+    fake_errors = np.append(np.cumsum(real_at[::-1])[::-1], 0)
+
+    budget = int(np.floor((1 - target_agreement) * n + 1e-9))
+    best = None
+    for k in range(len(values) + 1):
+        remaining = budget - fake_errors[k]
+        if remaining < 0:
+            continue
+        # Largest real threshold below the fake one that stays within budget
+        j = min(int(np.searchsorted(real_errors, remaining, side='right')) - 1, k - 1)
+        covered = fake_exits[k] + (real_exits[j] if j >= 0 else 0)
+        errors = fake_errors[k] + (real_errors[j] if j >= 0 else 0)
+        if best is None or covered > best[0]:
+            best = (covered, errors, j, k)
+
+    covered, errors, j, k = best
+    return {
+        # Thresholds outside 0-100 disable that exit
+        'fake_threshold': float(values[k]) if k < len(values) else 101.0,
+        'real_threshold': float(values[j]) if j >= 0 else -1.0,
+        'early_exit_rate': float(covered / n) if n else 0.0,
+        'agreement': float(1 - errors / n) if n else 1.0,
+        'target_agreement': target_agreement
+    }
+
+
+def cascade_timing(cascade, texts, titles=None, repeats=5):
+    """Best-of-repeats milliseconds for the rule screen, the model alone and the cascade"""
+    titles = titles if titles is not None else [""] * len(texts)
+
+    def best_ms(action):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            action()
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings)
+
+    counts = dict(cascade.tier_counts)
+    timing = {
+        'rules': best_ms(lambda: rule_fake_probabilities(titles, texts)),
+        'model': best_ms(lambda: cascade.detector.predict_batch(texts)),
+        'cascade': best_ms(lambda: cascade.analyze_batch(texts, titles))
+    }
+    # Timing runs are not traffic
+    cascade.tier_counts = counts
+    return timing
+
+
+def save_thresholds(thresholds, path=THRESHOLDS_FILE):
+    with open(path, 'w') as f:
+        json.dump(thresholds, f, indent=2)
+
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+    from app import FakeNewsDetector
+
+    parser = argparse.ArgumentParser(description="Calibrate and evaluate the rule/model cascade")
+    parser.add_argument('--data', default='dataset.csv', help="CSV with a 'text' column")
+    parser.add_argument('--target', type=float, default=0.98,
+                        help="required agreement with the full pipeline")
+    parser.add_argument('--repeats', type=int, default=5, help="timing runs, the best is reported")
+    args = parser.parse_args()
+
+    detector = FakeNewsDetector()
+    if detector.model is None:
+        raise SystemExit(1)
+
+    texts = pd.read_csv(args.data)['text'].fillna('').astype(str).tolist()
+
+    print("\n🎚️  CALIBRATING CASCADE THRESHOLDS...")
+    thresholds = calibrate_thresholds(detector, texts, args.target)
+    save_thresholds(thresholds)
+    print(f"🚨 Fake threshold: {thresholds['fake_threshold']:.1f}")
+    print(f"✅ Real threshold: {thresholds['real_threshold']:.1f}")
+    print(f"🤝 Agreement with full pipeline: {thresholds['agreement'] * 100:.1f}%")
+    print(f"⚡ Early exit rate: {thresholds['early_exit_rate'] * 100:.1f}%")
+    print(f"💾 Thresholds saved as '{THRESHOLDS_FILE}'")
+
+    cascade = CascadeDetector.from_file(detector)
+    cascade.analyze_batch(texts)
+    print("\n📊 TIER HIT RATES:")
+    for tier, rate in cascade.hit_rates().items():
+        print(f"   {tier}: {rate * 100:.1f}%")
+
+    timing = cascade_timing(cascade, texts, repeats=args.repeats)
+    print(f"\n⏱️  COST FOR {len(texts)} ARTICLES (best of {args.repeats}):")
+    print(f"   rule screening: {timing['rules']:8.2f} ms")
+    print(f"   model only:     {timing['model']:8.2f} ms")
+    print(f"   cascade:        {timing['cascade']:8.2f} ms")
+    print(f"⚡ Cascade time vs model only: {(timing['cascade'] / timing['model'] - 1) * 100:+.1f}%")
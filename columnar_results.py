@@ -0,0 +1,288 @@
+# columnar_results.py
+# COLUMNAR, COMPRESSED STORAGE FOR BULK SCORING RESULTS
+#
+# Directory layout (<name>.newscols):
+#   meta.json        column dtypes, indicator names and, per row group, the
+#                    row count and the (offset, length) of each column chunk
+#   <column>.col     zlib-compressed little-endian chunks, one per row group
+#
+# Columns:
+#   id               int64   article id
+#   prediction       uint8   0 = real, 1 = fake
+#   confidence       float32
+#   indicators       uint16/uint64 bitset, bit i = indicator_names[i] matched
+#   trusted_source   bool
+import json
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from low_memory import LABELS, LABEL_CODES, encode_indicators
+
+RESULTS_SUFFIX = '.newscols'
+META_FILE = 'meta.json'
+ROW_GROUP_SIZE = 65536
+
+
+def _column_dtypes(indicator_names):
+    if len(indicator_names) > 64:
+        raise ValueError("At most 64 indicators fit in the bitset column")
+    return {
+        'id': np.dtype('<i8'),
+        'prediction': np.dtype('u1'),
+        'confidence': np.dtype('<f4'),
+        'indicators': np.dtype('<u2') if len(indicator_names) <= 16 else np.dtype('<u8'),
+        'trusted_source': np.dtype('?')
+    }
+
+
+class ResultsWriter:
+    """Stream scoring results into column files, one row group at a time
+
+    Full row groups are compressed and written by a background thread
+    (zlib releases the GIL), so the next batch can be scored meanwhile. At
+    most max_pending row groups wait in memory before write_batch blocks.
+    """
+
+    def __init__(self, path, indicator_names, row_group_size=ROW_GROUP_SIZE,
+                 compress_level=1, max_pending=2):
+        self.path = path
+        self.indicator_names = list(indicator_names)
+        self.dtypes = _column_dtypes(self.indicator_names)
+        self.row_group_size = row_group_size
+        self.compress_level = compress_level
+        self.max_pending = max_pending
+        os.makedirs(path, exist_ok=True)
+        self._files = {name: open(os.path.join(path, f"{name}.col"), 'wb') for name in self.dtypes}
+        self._buffers = {name: [] for name in self.dtypes}
+        self._buffered = 0
+        self._row_groups = []
+        self._pending = []
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.count = 0
+
+    def write_batch(self, ids, predictions, confidences, indicators, trusted_sources):
+        """Add a batch; predictions as 'real'/'fake', indicators as lists of names or a bitset array"""
+        predictions = np.asarray(predictions)
+        if predictions.dtype.kind not in 'iu':
+            predictions = np.fromiter((LABEL_CODES[label] for label in predictions),
+                                      dtype=np.uint8, count=len(predictions))
+        if not isinstance(indicators, np.ndarray):
+            indicators = encode_indicators(indicators, self.indicator_names)
+
+        columns = {
+            'id': ids,
+            'prediction': predictions,
+            'confidence': confidences,
+            'indicators': indicators,
+            'trusted_source': trusted_sources
+        }
+        rows = len(predictions)
+        for name, values in columns.items():
+            values = np.asarray(values, dtype=self.dtypes[name])
+            if len(values) != rows:
+                raise ValueError(f"Column '{name}' has {len(values)} rows, expected {rows}")
+            self._buffers[name].append(values)
+        self._buffered += rows
+        self.count += rows
+
+        while self._buffered >= self.row_group_size:
+            self._cut_row_group(self.row_group_size)
+
+    def append(self, result, article_id=None):
+        """Add one analyze_text result dict"""
+        self.write_batch([self.count if article_id is None else article_id], [result['prediction']],
+                         [result['confidence']], [result['indicators']], [result['trusted_source']])
+
+    def _cut_row_group(self, rows):
+        group = {}
+        for name, chunks in self._buffers.items():
+            values = np.concatenate(chunks)
+            group[name] = values[:rows]
+            self._buffers[name] = [values[rows:]] if len(values) > rows else []
+        self._buffered -= rows
+
+        # Bounded backlog; also surfaces errors from the writer thread
+        while len(self._pending) >= self.max_pending:
+            self._pending.pop(0).result()
+        self._pending.append(self._executor.submit(self._write_row_group, group, rows))
+
+    def _write_row_group(self, group, rows):
+        chunks = {}
+        for name, values in group.items():
+            compressed = zlib.compress(values.tobytes(), self.compress_level)
+            file = self._files[name]
+            chunks[name] = [file.tell(), len(compressed)]
+            file.write(compressed)
+        self._row_groups.append({'rows': rows, 'chunks': chunks})
+
+    def close(self):
+        if self._files is None:
+            return
+        if self._buffered:
+            self._cut_row_group(self._buffered)
+        for future in self._pending:
+            future.result()
+        self._executor.shutdown()
+        for file in self._files.values():
+            file.close()
+        self._files = None
+
+        meta = {
+            'version': 1,
+            'rows': self.count,
+            'labels': LABELS.tolist(),
+            'indicator_names': self.indicator_names,
+            'columns': {name: dtype.str for name, dtype in self.dtypes.items()},
+            'row_groups': self._row_groups
+        }
+        tmp_path = os.path.join(self.path, META_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.path, META_FILE))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ResultsReader:
+    """Load selected columns of a results directory
+
+    Only the files of the requested columns are opened and only their
+    chunks are decompressed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        if meta['version'] != 1:
+            raise ValueError(f"Unsupported results version {meta['version']}")
+        self.rows = meta['rows']
+        self.labels = np.array(meta['labels'], dtype=object)
+        self.indicator_names = meta['indicator_names']
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in meta['columns'].items()}
+        self.row_groups = meta['row_groups']
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def columns(self):
+        return list(self.dtypes)
+
+    def _read_chunks(self, name, groups):
+        dtype = self.dtypes[name]
+        parts = []
+        with open(os.path.join(self.path, f"{name}.col"), 'rb') as f:
+            for group in groups:
+                offset, length = group['chunks'][name]
+                f.seek(offset)
+                parts.append(np.frombuffer(zlib.decompress(f.read(length)), dtype=dtype))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+    def read(self, columns=None, row_groups=None):
+        """Return {column: array} for the given columns and row group indices"""
+        columns = self.columns if columns is None else list(columns)
+        for name in columns:
+            if name not in self.dtypes:
+                raise KeyError(f"No column '{name}'; columns are {self.columns}")
+        groups = self.row_groups if row_groups is None else [self.row_groups[i] for i in row_groups]
+        return {name: self._read_chunks(name, groups) for name in columns}
+
+    def iter_row_groups(self, columns=None):
+        for i in range(len(self.row_groups)):
+            yield self.read(columns, [i])
+
+    def decode_predictions(self, codes):
+        return self.labels[codes]
+
+    def decode_indicators(self, bitsets):
+        """Turn bitsets back into lists of indicator names"""
+        bitsets = np.asarray(bitsets, dtype=np.uint64)
+        if not self.indicator_names:
+            return [[] for _ in bitsets]
+        hits = [(bitsets >> np.uint64(i)) & np.uint64(1) for i in range(len(self.indicator_names))]
+        return [[name for name, hit in zip(self.indicator_names, row) if hit] for row in zip(*hits)]
+
+    def indicator_counts(self, bitsets=None):
+        """Articles matching each indicator, straight from the bitsets"""
+        if bitsets is None:
+            bitsets = self.read(['indicators'])['indicators']
+        bitsets = np.asarray(bitsets, dtype=np.uint64)
+        return {name: int(np.count_nonzero(bitsets & (np.uint64(1) << np.uint64(i))))
+                for i, name in enumerate(self.indicator_names)}
+
+
+def score_to_columns(detector, texts, path, batch_size=1024, row_group_size=ROW_GROUP_SIZE, start_id=0):
+    """Score texts in batches and stream the analyze_text fields to a results directory"""
+    with ResultsWriter(path, detector.FAKE_INDICATORS, row_group_size=row_group_size) as writer:
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            predictions, confidences = detector.predict_batch(batch)
+            lowered = [text.lower() for text in batch]
+            indicators = [[word for word in detector.FAKE_INDICATORS if word in text] for text in lowered]
+            trusted = [any(source in text for source in detector.TRUSTED_SOURCES) for text in lowered]
+            ids = np.arange(start_id + start, start_id + start + len(batch))
+            writer.write_batch(ids, predictions, confidences, indicators, trusted)
+    return writer.count
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Columnar storage for bulk scoring results")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    score = commands.add_parser('score', help="score a CSV or article archive into a results directory")
+    score.add_argument('data')
+    score.add_argument('out', help=f"results directory, e.g. results{RESULTS_SUFFIX}")
+    score.add_argument('--batch-size', type=int, default=1024)
+    score.add_argument('--row-group-size', type=int, default=ROW_GROUP_SIZE)
+
+    read = commands.add_parser('read', help="summarize selected columns of a results directory")
+    read.add_argument('path')
+    read.add_argument('--columns', nargs='+', default=['prediction', 'confidence'])
+
+    args = parser.parse_args()
+
+    if args.command == 'score':
+        from app import FakeNewsDetector
+        detector = FakeNewsDetector()
+        if detector.model is None:
+            raise SystemExit(1)
+
+        from article_archive import ArticleArchive, is_archive
+        if is_archive(args.data):
+            with ArticleArchive(args.data) as archive:
+                texts = archive[:]
+        else:
+            import pandas as pd
+            texts = pd.read_csv(args.data)['text'].fillna('').astype(str).tolist()
+
+        started = time.perf_counter()
+        rows = score_to_columns(detector, texts, args.out, args.batch_size, args.row_group_size)
+        size = sum(entry.stat().st_size for entry in os.scandir(args.out))
+        print(f"💾 {rows} results written to '{args.out}' in {time.perf_counter() - started:.2f}s"
+              f" ({size / 1024:.1f} KB)")
+
+    elif args.command == 'read':
+        reader = ResultsReader(args.path)
+        started = time.perf_counter()
+        columns = reader.read(args.columns)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"📂 {len(reader)} rows, {len(reader.row_groups)} row groups; loaded {', '.join(columns)} in {elapsed:.1f} ms")
+        if 'prediction' in columns:
+            labels, counts = np.unique(reader.decode_predictions(columns['prediction']), return_counts=True)
+            print("🤖 Predictions: " + ", ".join(f"{label} {count}" for label, count in zip(labels, counts)))
+        if 'confidence' in columns and len(columns['confidence']):
+            print(f"📊 Mean confidence: {columns['confidence'].mean() * 100:.1f}%")
+        if 'indicators' in columns:
+            hits = {name: count for name, count in reader.indicator_counts(columns['indicators']).items() if count}
+            print("🚨 Indicator hits: " + (", ".join(f"{name} {count}" for name, count in hits.items()) or "none"))
@@ -0,0 +1,489 @@
+# drift_monitor.py
+# CONSTANT-MEMORY DRIFT MONITORING WITH MERGEABLE SKETCHES
+import json
+import math
+import time
+import zlib
+from collections import Counter, deque
+
+import numpy as np
+
+WINDOW_SECONDS = 3600
+SAMPLE_EVERY = 50
+
+
+class QuantileSketch:
+    """Fixed-bin histogram of values in [lo, hi]
+
+    For bounded values such as probabilities this is a quantile digest with
+    rank error below one bin width; two sketches merge by adding counts.
+    """
+
+    def __init__(self, bins=1000, lo=0.0, hi=1.0, counts=None):
+        self.bins = bins
+        self.lo = lo
+        self.hi = hi
+        self.counts = np.zeros(bins, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        index = ((values - self.lo) * (self.bins / (self.hi - self.lo))).astype(np.int64)
+        np.clip(index, 0, self.bins - 1, out=index)
+        self.counts += np.bincount(index, minlength=self.bins)
+
+    def quantile(self, q):
+        total = self.count
+        if not total:
+            return float('nan')
+        index = int(np.searchsorted(np.cumsum(self.counts), max(q * total, 1)))
+        return self.lo + (index + 0.5) * (self.hi - self.lo) / self.bins
+
+    def merge(self, other):
+        if (self.bins, self.lo, self.hi) != (other.bins, other.lo, other.hi):
+            raise ValueError("Cannot merge quantile sketches with different bins")
+        self.counts += other.counts
+        return self
+
+    def to_dict(self):
+        return {'bins': self.bins, 'lo': self.lo, 'hi': self.hi, 'counts': self.counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['bins'], data['lo'], data['hi'], data['counts'])
+
+
+class CountMinSketch:
+    """Approximate counts of byte-string keys in a fixed depth x width table
+
+    Keys are hashed with crc32 and per-row multiply-shift hashing from a fixed
+    seed, so sketches built in different processes merge by adding tables.
+    Estimates never undercount.
+    """
+
+    def __init__(self, width=2048, depth=4, seed=0, table=None):
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=(depth, 1), dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=(depth, 1), dtype=np.uint64)
+        self.table = np.zeros((depth, width), dtype=np.int64) if table is None else np.asarray(table, dtype=np.int64)
+
+    def _columns(self, keys):
+        hashes = np.fromiter((zlib.crc32(key) for key in keys), dtype=np.uint64, count=len(keys))
+        # uint64 arithmetic wraps, which is what multiply-shift hashing wants
+        return ((self._a * hashes + self._b) >> np.uint64(32)) % np.uint64(self.width)
+
+    def add(self, keys, counts):
+        if not keys:
+            return
+        columns = self._columns(keys)
+        counts = np.asarray(counts, dtype=np.int64)
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], counts)
+
+    def estimate(self, keys):
+        if not keys:
+            return np.zeros(0, dtype=np.int64)
+        columns = self._columns(keys)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other):
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("Cannot merge count-min sketches with different shapes or seeds")
+        self.table += other.table
+        return self
+
+    def to_dict(self):
+        return {'width': self.width, 'depth': self.depth, 'seed': self.seed, 'table': self.table.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['width'], data['depth'], data['seed'], data['table'])
+
+
+class WindowStats:
+    """Sketches of everything observed in one time window"""
+
+    def __init__(self, start, indicators, top_k=20):
+        self.start = start
+        self.indicators = list(indicators)
+        self.top_k = top_k
+        self.articles = 0
+        self.sampled = 0
+        self.tokens = 0
+        self.oov_tokens = 0
+        self.indicator_hits = np.zeros(len(self.indicators), dtype=np.int64)
+        self.fake_probability = QuantileSketch()
+        self.oov_terms = CountMinSketch()
+        # Bounded set of candidate frequent OOV terms, counted by oov_terms
+        self.top_oov = {}
+
+    def add_oov_terms(self, terms):
+        """Count a Counter of OOV terms (bytes) and refresh the top-k candidates"""
+        keys = list(terms)
+        self.oov_terms.add(keys, list(terms.values()))
+        candidates = list(set(keys) | set(self.top_oov))
+        estimates = self.oov_terms.estimate(candidates)
+        keep = np.argsort(-estimates, kind='stable')[:self.top_k]
+        self.top_oov = {candidates[i]: int(estimates[i]) for i in keep}
+
+    def merge(self, other):
+        if self.indicators != other.indicators:
+            raise ValueError("Cannot merge windows with different indicator lists")
+        self.start = min(self.start, other.start)
+        self.articles += other.articles
+        self.sampled += other.sampled
+        self.tokens += other.tokens
+        self.oov_tokens += other.oov_tokens
+        self.indicator_hits += other.indicator_hits
+        self.fake_probability.merge(other.fake_probability)
+        self.oov_terms.merge(other.oov_terms)
+        self.add_oov_terms(Counter(dict.fromkeys(other.top_oov, 0)))
+        return self
+
+    def summary(self):
+        sampled = max(self.sampled, 1)
+        return {
+            'start': self.start,
+            'articles': self.articles,
+            'oov_rate': self.oov_tokens / self.tokens if self.tokens else 0.0,
+            'fake_probability': {f"p{int(q * 100)}": self.fake_probability.quantile(q)
+                                 for q in (0.1, 0.5, 0.9)},
+            'indicator_rates': {name: int(hits) / sampled
+                                for name, hits in zip(self.indicators, self.indicator_hits)},
+            'top_oov': {term.decode('utf-8', 'replace'): count for term, count in self.top_oov.items()}
+        }
+
+    def to_dict(self):
+        return {
+            'start': self.start,
+            'indicators': self.indicators,
+            'top_k': self.top_k,
+            'articles': self.articles,
+            'sampled': self.sampled,
+            'tokens': self.tokens,
+            'oov_tokens': self.oov_tokens,
+            'indicator_hits': self.indicator_hits.tolist(),
+            'fake_probability': self.fake_probability.to_dict(),
+            'oov_terms': self.oov_terms.to_dict(),
+            'top_oov': {term.decode('utf-8', 'surrogateescape'): count for term, count in self.top_oov.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        window = cls(data['start'], data['indicators'], data['top_k'])
+        for key in ('articles', 'sampled', 'tokens', 'oov_tokens'):
+            setattr(window, key, data[key])
+        window.indicator_hits = np.asarray(data['indicator_hits'], dtype=np.int64)
+        window.fake_probability = QuantileSketch.from_dict(data['fake_probability'])
+        window.oov_terms = CountMinSketch.from_dict(data['oov_terms'])
+        window.top_oov = {term.encode('utf-8', 'surrogateescape'): count for term, count in data['top_oov'].items()}
+        return window
+
+
+class DriftMonitor:
+    """Per-window OOV rate, fake probability distribution and indicator hit rates
+
+    Attach to a detector with detector.monitor = DriftMonitor(detector).
+    Every scored article goes into the probability sketch; tokens and rule
+    indicators are only examined for every sample_every-th article, which
+    keeps the cost on the scoring path to a small fraction of vectorizing.
+    Memory is fixed: one set of sketches per window and at most
+    max_windows closed windows.
+    """
+
+    def __init__(self, detector, window_seconds=WINDOW_SECONDS, sample_every=SAMPLE_EVERY,
+                 max_windows=24, top_k=20):
+        self.indicators = list(detector.FAKE_INDICATORS)
+        self.window_seconds = window_seconds
+        self.sample_every = sample_every
+        self.top_k = top_k
+        self.windows = deque(maxlen=max_windows)
+        self.current = None
+        self._seen = 0
+
+        vectorizer = detector.vectorizer
+        # Stop words are removed before the vocabulary lookup, so they are
+        # neither known nor out of vocabulary. _tokens yields UTF-8 bytes.
+        self._stop_words = {word.encode('utf-8') for word in vectorizer.get_stop_words() or ()}
+        self._known = {term.encode('utf-8') for term in vectorizer.vocabulary_}
+        fast = detector.fast_vectorizer
+        self._ascii_table = fast.ascii_table if fast is not None else None
+        self._analyze = vectorizer.build_analyzer()
+
+    def _window(self, now):
+        start = math.floor(now / self.window_seconds) * self.window_seconds if math.isfinite(self.window_seconds) else 0
+        if self.current is None or self.current.start != start:
+            if self.current is not None:
+                self.windows.append(self.current)
+            self.current = WindowStats(start, self.indicators, self.top_k)
+        return self.current
+
+    def _tokens(self, text):
+        """Tokens as bytes, split the same way the vectorizer does"""
+        if self._ascii_table is not None and text.isascii():
+            return text.encode('ascii').translate(self._ascii_table).split()
+        return [token.encode('utf-8') for token in self._analyze(text)]
+
+    def observe(self, texts, fake_probabilities, indicators=None, now=None):
+        """Record a scored batch; indicators are the analyze_text matches, if known"""
+        window = self._window(time.time() if now is None else now)
+        window.articles += len(texts)
+        window.fake_probability.add(fake_probabilities)
+
+        first = (-self._seen) % self.sample_every
+        self._seen += len(texts)
+        if first >= len(texts):
+            return
+
+        oov = Counter()
+        known = self._known
+        stop_words = self._stop_words
+        for i in range(first, len(texts), self.sample_every):
+            text = texts[i]
+            for token, count in Counter(self._tokens(text)).items():
+                if token in known:
+                    window.tokens += count
+                elif len(token) > 1 and token not in stop_words:
+                    window.tokens += count
+                    oov[token] += count
+            found = indicators[i] if indicators is not None else None
+            if found is None:
+                lowered = text.lower()
+                found = [word for word in self.indicators if word in lowered]
+            for word in found:
+                window.indicator_hits[self.indicators.index(word)] += 1
+            window.sampled += 1
+
+        window.oov_tokens += sum(oov.values())
+        window.add_oov_terms(oov)
+
+    def snapshots(self):
+        """All retained windows, oldest first, as JSON-ready dicts"""
+        windows = list(self.windows) + ([self.current] if self.current is not None else [])
+        return [window.to_dict() for window in windows]
+
+    def export(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.snapshots(), f)
+
+
+def build_baseline(detector, texts, batch_size=1000):
+    """One window of sketches over reference texts, e.g. the training data"""
+    monitor = DriftMonitor(detector, window_seconds=math.inf, sample_every=1)
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        monitor.observe(batch, detector.predict_fake_proba(batch))
+    return monitor.current or WindowStats(0, monitor.indicators)
+
+
+def load_windows(path):
+    """Windows from an exported snapshot file or a single baseline window"""
+    with open(path) as f:
+        data = json.load(f)
+    return [WindowStats.from_dict(item) for item in (data if isinstance(data, list) else [data])]
+
+
+def compare(window, baseline, psi_bins=10, psi_alert=0.2, oov_alert=0.05, indicator_alert=0.1):
+    """How far a window has drifted from the baseline window"""
+    current, reference = window.summary(), baseline.summary()
+
+    # Population stability index over coarse probability bins
+    def coarse(sketch):
+        counts = sketch.counts.reshape(psi_bins, -1).sum(axis=1).astype(np.float64)
+        return np.maximum(counts / max(counts.sum(), 1), 1e-6)
+    p, q = coarse(window.fake_probability), coarse(baseline.fake_probability)
+    psi = float(np.sum((p - q) * np.log(p / q)))
+
+    oov_delta = current['oov_rate'] - reference['oov_rate']
+    indicator_deltas = {name: rate - reference['indicator_rates'].get(name, 0.0)
+                        for name, rate in current['indicator_rates'].items()}
+
+    # Frequent OOV terms that were rare in the baseline
+    new_terms = list(window.top_oov)
+    baseline_counts = baseline.oov_terms.estimate(new_terms)
+    scale = max(window.tokens, 1) / max(baseline.tokens, 1)
+    emerging = {term.decode('utf-8', 'replace'): window.top_oov[term]
+                for term, base in zip(new_terms, baseline_counts)
+                if window.top_oov[term] > 2 * base * scale}
+
+    alerts = []
+    if psi > psi_alert:
+        alerts.append(f"fake probability distribution shifted (PSI {psi:.3f})")
+    if oov_delta > oov_alert:
+        alerts.append(f"OOV rate up {oov_delta * 100:.1f} points")
+    for name, delta in indicator_deltas.items():
+        if abs(delta) > indicator_alert:
+            alerts.append(f"indicator '{name}' rate changed {delta * 100:+.1f} points")
+
+    return {
+        'start': current['start'],
+        'articles': current['articles'],
+        'oov_rate': current['oov_rate'],
+        'oov_delta': oov_delta,
+        'psi': psi,
+        'fake_probability': current['fake_probability'],
+        'baseline_fake_probability': reference['fake_probability'],
+        'indicator_deltas': indicator_deltas,
+        'emerging_terms': emerging,
+        'alerts': alerts
+    }
+
+
+def print_comparison(result):
+    print(f"\n📅 Window starting {time.strftime('%Y-%m-%d %H:%M', time.localtime(result['start']))}"
+          f" ({result['articles']} articles)")
+    print(f"📖 OOV rate: {result['oov_rate'] * 100:.1f}% ({result['oov_delta'] * 100:+.1f} vs baseline)")
+    quantiles = ", ".join(f"{name} {value:.2f} (was {result['baseline_fake_probability'][name]:.2f})"
+                          for name, value in result['fake_probability'].items())
+    print(f"📊 Fake probability: {quantiles}; PSI {result['psi']:.3f}")
+    if result['emerging_terms']:
+        print(f"🆕 Emerging terms: {', '.join(result['emerging_terms'])}")
+    for alert in result['alerts']:
+        print(f"🚨 {alert}")
+    if not result['alerts']:
+        print("✅ No drift detected")
+
+
+# --- Self test -------------------------------------------------------------
+
+SELFTEST_TEXTS = [
+    "Officials confirmed the report after the ministry statement",
+    "Breaking shocking viral claim spreads on social media",
+    "Le café du coin sert un résumé naïve de la journée",
+    "Über die Straße läuft eine Katze im Frühling",
+    "Police said the investigation into the incident continues",
+    "Ein naïve résumé über das café und die Straße",
+]
+
+
+def selftest(articles=600, sample_every=3):
+    """Check OOV counting and that exported, merged windows equal one whole run
+
+    Uses a vectorizer fitted on mixed ASCII and accented text, so known
+    non-ASCII terms must not count as OOV. Returns a list of problems.
+    """
+    import random
+    from types import SimpleNamespace
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from fast_vectorizer import build_fast_vectorizer
+
+    vectorizer = TfidfVectorizer(stop_words='english').fit(SELFTEST_TEXTS)
+    detector = SimpleNamespace(FAKE_INDICATORS=['shocking', 'viral', 'breaking'], vectorizer=vectorizer,
+                               fast_vectorizer=build_fast_vectorizer(vectorizer))
+    problems = []
+
+    monitor = DriftMonitor(detector, window_seconds=math.inf, sample_every=1)
+    monitor.observe(["café résumé naïve", "Straße façade zebra the"], [0.1, 0.9], now=0)
+    summary = monitor.current.summary()
+    # Known: café résumé naïve straße; OOV: façade zebra; 'the' is a stop word
+    if monitor.current.tokens != 6 or monitor.current.oov_tokens != 2:
+        problems.append(f"expected 2 of 6 tokens OOV, got {monitor.current.oov_tokens} of {monitor.current.tokens}")
+    if set(summary['top_oov']) != {'façade', 'zebra'}:
+        problems.append(f"top_oov should be façade and zebra, got {sorted(summary['top_oov'])}")
+
+    # The same stream, whole and as two halves exported to JSON and merged
+    rng = random.Random(0)
+    extra = ['façade', 'zebra', 'naïveté', 'smörgåsbord', 'xylophone', '日本語', 'quokka']
+    texts = [f"{rng.choice(SELFTEST_TEXTS)} {' '.join(rng.choices(extra, k=rng.randint(0, 3)))}"
+             for _ in range(articles)]
+    probabilities = [rng.random() for _ in texts]
+    half = articles // 2 - articles // 2 % sample_every
+
+    def run(start, stop):
+        part = DriftMonitor(detector, window_seconds=math.inf, sample_every=sample_every)
+        for batch in range(start, stop, 64):
+            end = min(batch + 64, stop)
+            part.observe(texts[batch:end], probabilities[batch:end], now=0)
+        return part.current
+
+    whole = run(0, articles)
+    halves = [WindowStats.from_dict(json.loads(json.dumps(run(start, stop).to_dict())))
+              for start, stop in ((0, half), (half, articles))]
+    merged = halves[0].merge(halves[1])
+
+    for key in ('articles', 'sampled', 'tokens', 'oov_tokens'):
+        if getattr(merged, key) != getattr(whole, key):
+            problems.append(f"merged {key} {getattr(merged, key)} != whole {getattr(whole, key)}")
+    for name, a, b in (('indicator hits', merged.indicator_hits, whole.indicator_hits),
+                       ('probability sketch', merged.fake_probability.counts, whole.fake_probability.counts),
+                       ('OOV sketch', merged.oov_terms.table, whole.oov_terms.table)):
+        if not np.array_equal(a, b):
+            problems.append(f"merged {name} differs from the whole run")
+    if merged.summary()['top_oov'] != whole.summary()['top_oov']:
+        problems.append(f"merged top_oov {merged.summary()['top_oov']} != whole {whole.summary()['top_oov']}")
+    if set(whole.summary()['top_oov']) != set(extra):
+        problems.append(f"top_oov {sorted(whole.summary()['top_oov'])} != {sorted(extra)}")
+    return problems
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Drift monitoring with streaming sketches")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    baseline_parser = commands.add_parser('baseline', help="build a baseline from reference data")
+    baseline_parser.add_argument('data', help="CSV or article archive with a text column")
+    baseline_parser.add_argument('out')
+
+    score = commands.add_parser('score', help="score data with the monitor attached and export its windows")
+    score.add_argument('data')
+    score.add_argument('out')
+    score.add_argument('--batch-size', type=int, default=1000)
+    score.add_argument('--window-seconds', type=float, default=WINDOW_SECONDS)
+    score.add_argument('--sample-every', type=int, default=SAMPLE_EVERY)
+
+    compare_parser = commands.add_parser('compare', help="compare exported windows with a baseline")
+    compare_parser.add_argument('snapshots')
+    compare_parser.add_argument('baseline')
+
+    commands.add_parser('selftest', help="check OOV counting and exact merging of exported windows")
+
+    args = parser.parse_args()
+
+    if args.command == 'selftest':
+        problems = selftest()
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            raise SystemExit(1)
+        print("✅ Non-ASCII vocabulary counted as known; merged windows match the whole run")
+        raise SystemExit(0)
+
+    if args.command == 'compare':
+        baseline = load_windows(args.baseline)[0]
+        for window in load_windows(args.snapshots):
+            print_comparison(compare(window, baseline))
+        raise SystemExit(0)
+
+    from app import FakeNewsDetector
+    detector = FakeNewsDetector()
+    if detector.model is None:
+        raise SystemExit(1)
+
+    from article_archive import ArticleArchive, is_archive
+    if is_archive(args.data):
+        with ArticleArchive(args.data) as archive:
+            texts = archive[:]
+    else:
+        import pandas as pd
+        texts = pd.read_csv(args.data)['text'].fillna('').astype(str).tolist()
+
+    if args.command == 'baseline':
+        with open(args.out, 'w') as f:
+            json.dump(build_baseline(detector, texts).to_dict(), f)
+        print(f"💾 Baseline over {len(texts)} articles saved to '{args.out}'")
+
+    elif args.command == 'score':
+        detector.monitor = DriftMonitor(detector, window_seconds=args.window_seconds,
+                                        sample_every=args.sample_every)
+        for start in range(0, len(texts), args.batch_size):
+            detector.predict_batch(texts[start:start + args.batch_size])
+        detector.monitor.export(args.out)
+        print(f"💾 {len(detector.monitor.snapshots())} window snapshots saved to '{args.out}'")
@@ -1,10 +1,10 @@
+import time
 import streamlit as st
-import pandas as pd
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-import joblib
-import re
+# The rule tables live at module level in news_rules, so they are built
+# once per process; Streamlit reruns this script but not its imports.
+from news_rules import advanced_news_detection
+
+run_started = time.perf_counter()
 
 # Page configuration
 st.set_page_config(
@@ -74,86 +74,10 @@ if 'content' not in st.session_state:
     st.session_state.content = ""
 if 'analysis_result' not in st.session_state:
     st.session_state.analysis_result = None
-
-# Improved detection function
-def advanced_news_detection(title, content):
-    full_text = (title + " " + content).lower()
-    
-    # Enhanced keyword lists with weights
-    fake_indicators = {
-        'viral claim': 3, 'deepfake': 4, 'fabricated': 3, 'hoax': 3, 'misinformation': 3,
-        'conspiracy': 2, 'false': 3, 'fake': 4, 'baseless': 2, 'computer generated': 3,
-        'ai-generated': 3, 'unverified': 2, 'misleading': 2, 'old video': 2, 'photoshopped': 3,
-        'doctored': 3, 'satirical': 1, 'parody': 1, 'clickbait': 2, 'sensational': 2,
-        'breaking exclusive': 2, 'shocking': 2, 'you won\'t believe': 2, 'secret they don\'t want you to know': 3
-    }
-    
-    real_indicators = {
-        'confirmed': 3, 'official': 3, 'police': 2, 'government': 2, 'verified': 3,
-        'according to': 2, 'statement': 2, 'report': 2, 'authorities': 2, 'bilateral': 1,
-        'rescue operations': 2, 'fact check': 2, 'experts confirm': 3, 'official sources': 3,
-        'nia': 2, 'pib': 3, 'investigation': 2, 'press conference': 2, 'ministry': 2,
-        'authenticated': 3, 'evidence-based': 2, 'peer-reviewed': 2, 'transparent': 1
-    }
-    
-    # Calculate scores
-    fake_score = 0
-    real_score = 0
-    detected_fake = []
-    detected_real = []
-    
-    # Check fake indicators
-    for word, weight in fake_indicators.items():
-        if word in full_text:
-            fake_score += weight
-            detected_fake.append(word)
-    
-    # Check real indicators
-    for word, weight in real_indicators.items():
-        if word in full_text:
-            real_score += weight
-            detected_real.append(word)
-    
-    # Text analysis features
-    text_length = len(full_text)
-    exclamation_count = full_text.count('!')
-    question_count = full_text.count('?')
-    capital_ratio = len(re.findall(r'[A-Z]', title + content)) / len(title + content) if len(title + content) > 0 else 0
-    
-    # Additional scoring based on text patterns
-    if exclamation_count > 3:
-        fake_score += 2
-    if question_count > 5:
-        fake_score += 1
-    if capital_ratio > 0.4:
-        fake_score += 2
-    if text_length < 100:
-        fake_score += 1
-    
-    # Calculate probability with balanced approach
-    total_score = fake_score + real_score
-    if total_score > 0:
-        fake_probability = min(100, (fake_score / total_score) * 100)
-    else:
-        fake_probability = 50  # Neutral if no indicators found
-    
-    # Adjust probability based on confidence
-    confidence_factor = min(1.0, total_score / 20)
-    fake_probability = 50 + (fake_probability - 50) * confidence_factor
-    
-    return {
-        'fake_probability': min(95, max(5, fake_probability)),
-        'fake_score': fake_score,
-        'real_score': real_score,
-        'detected_fake': detected_fake,
-        'detected_real': detected_real,
-        'text_analysis': {
-            'length': text_length,
-            'exclamations': exclamation_count,
-            'questions': question_count,
-            'capital_ratio': capital_ratio
-        }
-    }
+if 'verdict_cache' not in st.session_state:
+    st.session_state.verdict_cache = {}
+if 'latencies' not in st.session_state:
+    st.session_state.latencies = []
 
 # Sample news database
 real_news_examples = [
@@ -201,6 +125,28 @@ fake_news_examples = [
      }
 ]
 
+@st.cache_resource
+def example_verdicts():
+    """Verdicts for the built-in examples, computed once and shared by all sessions"""
+    return {(news["title"], news["content"]): advanced_news_detection(news["title"], news["content"])
+            for news in real_news_examples + fake_news_examples}
+
+VERDICT_CACHE_SIZE = 100
+
+def analyze_news(title, content):
+    """Analyze news, reusing example verdicts and this session's earlier results"""
+    key = (title, content)
+    result = example_verdicts().get(key)
+    if result is None:
+        cache = st.session_state.verdict_cache
+        result = cache.get(key)
+        if result is None:
+            result = advanced_news_detection(title, content)
+            if len(cache) >= VERDICT_CACHE_SIZE:
+                cache.pop(next(iter(cache)))
+            cache[key] = result
+    return result
+
 # Main layout
 col1, col2 = st.columns([2, 1])
 
@@ -221,7 +167,7 @@ with col1:
         if submitted:
             if title.strip() and content.strip():
                 with st.spinner("🤖 AI is analyzing the news content..."):
-                    result = advanced_news_detection(title, content)
+                    result = analyze_news(title, content)
                     st.session_state.analysis_result = result
                     
                     # Display results
@@ -283,6 +229,8 @@ with col2:
             st.session_state.title = news["title"]
             st.session_state.content = news["content"]
             st.session_state.analysis_result = None
+            # st.rerun() stops this run, so time the click across both runs
+            st.session_state.interaction_started = run_started
             st.rerun()
     
     st.write("---")
@@ -293,6 +241,8 @@ with col2:
             st.session_state.title = news["title"]
             st.session_state.content = news["content"]
             st.session_state.analysis_result = None
+            # st.rerun() stops this run, so time the click across both runs
+            st.session_state.interaction_started = run_started
             st.rerun()
 
 # Footer
@@ -315,4 +265,13 @@ with st.expander("ℹ️ How to use this detector"):
     4. **Verify**: Always cross-check with official sources for important news
     
     **Tip**: The system works best with complete news articles rather than just headlines.
-    """)
\ No newline at end of file
+    """)
+
+# Interaction latency for this session (time to run the whole page, from
+# the first run when an example click triggered a rerun)
+latency_ms = (time.perf_counter() - st.session_state.pop('interaction_started', run_started)) * 1000
+st.session_state.latencies = (st.session_state.latencies + [latency_ms])[-50:]
+with st.sidebar.expander("⏱️ Performance"):
+    latencies = sorted(st.session_state.latencies)
+    st.write(f"Last run: {latency_ms:.1f} ms")
+    st.write(f"Median of last {len(latencies)} runs: {latencies[len(latencies) // 2]:.1f} ms")
\ No newline at end of file
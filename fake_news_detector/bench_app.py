@@ -0,0 +1,48 @@
+# bench_app.py
+# MEASURE INTERACTION LATENCY OF THE STREAMLIT PAGE
+#
+# Runs the page headless with streamlit's AppTest and times the first load,
+# example clicks and form submissions. Compare two versions of the page with
+#   python bench_app.py app.py
+#   python bench_app.py old_app.py
+import argparse
+import os
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+
+def timed(action):
+    start = time.perf_counter()
+    action()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(path, runs=10):
+    """Return {interaction: [milliseconds, ...]} for the page at path"""
+    results = {'first load': [], 'example click': [], 'analyze submit': []}
+
+    at = AppTest.from_file(path, default_timeout=60)
+    results['first load'].append(timed(at.run))
+
+    example_keys = [button.key for button in at.button if button.key and button.key.startswith(('real_', 'fake_'))]
+    for _ in range(runs):
+        for key in example_keys:
+            results['example click'].append(timed(lambda: at.button(key=key).click().run()))
+            submit = next(button for button in at.button if 'Analyze' in button.label)
+            results['analyze submit'].append(timed(lambda: submit.click().run()))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time interactions with the Streamlit page")
+    parser.add_argument('path', nargs='?', default=os.path.join(os.path.dirname(__file__), 'app.py'))
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"⏱️  BENCHMARKING {args.path}")
+    print("=" * 50)
+    for interaction, timings in bench(args.path, args.runs).items():
+        print(f"{interaction:16} median {statistics.median(timings):8.1f} ms"
+              f"   max {max(timings):8.1f} ms   ({len(timings)} runs)")
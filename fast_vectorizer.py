@@ -0,0 +1,272 @@
+# fast_vectorizer.py
+# FAST TF-IDF FEATURES FOR A TRAINED VECTORIZER
+import re
+import string
+import time
+from collections import Counter
+from itertools import repeat
+
+import numpy as np
+import scipy.sparse as sp
+
+# sklearn's default token_pattern. On ASCII text it splits on anything that is
+# not [A-Za-z0-9_], which bytes.translate + split does far faster than re.
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+_WORD_BYTES = frozenset((string.ascii_letters + string.digits + '_').encode())
+_ASCII_SPLIT = bytes(b if b in _WORD_BYTES else 32 for b in range(256))
+_ASCII_SPLIT_LOWER = bytes(b + 32 if 65 <= b <= 90 else b for b in _ASCII_SPLIT)
+
+
+class FastVectorizer:
+    """Inference-only replacement for a fitted word-level TfidfVectorizer.
+
+    Each document is tokenized and counted in one pass, only its distinct
+    tokens are looked up in the vocabulary, unknown tokens are dropped
+    straight away, and the CSR arrays for the whole batch are built directly
+    with numpy. With the
+    default token pattern, ASCII documents are tokenized on bytes; single
+    character tokens from that split are never in the vocabulary, so they
+    fall out at the lookup just like out-of-vocabulary words.
+    """
+
+    def __init__(self, vocabulary, idf, token_pattern, lowercase=True,
+                 norm='l2', sublinear_tf=False, binary=False, dtype=np.float64, n_features=None):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.token_pattern = re.compile(token_pattern)
+        self.lowercase = lowercase
+        self.ascii_table = None
+        if token_pattern == DEFAULT_TOKEN_PATTERN:
+            self.ascii_table = _ASCII_SPLIT_LOWER if lowercase else _ASCII_SPLIT
+        # str keys for the regex path and bytes keys for the ASCII path
+        self._lookup = dict(vocabulary)
+        self._lookup.update((term.encode('ascii'), index)
+                            for term, index in vocabulary.items() if term.isascii())
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.dtype = dtype
+        self.n_features = len(vocabulary) if n_features is None else n_features
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer):
+        """Build from a fitted TfidfVectorizer, or raise ValueError if unsupported"""
+        if vectorizer.analyzer != 'word' or tuple(vectorizer.ngram_range) != (1, 1):
+            raise ValueError("Only word unigram vectorizers are supported")
+        if vectorizer.tokenizer is not None or vectorizer.preprocessor is not None:
+            raise ValueError("Custom tokenizer/preprocessor is not supported")
+        if vectorizer.strip_accents is not None or vectorizer.input != 'content':
+            raise ValueError("strip_accents and file/filename input are not supported")
+        if vectorizer.token_pattern is None:
+            raise ValueError("A token_pattern is required")
+
+        # Stop words are removed before the vocabulary lookup in sklearn, so
+        # dropping them from the lookup table gives the same features.
+        stop_words = vectorizer.get_stop_words() or ()
+        vocabulary = {term: int(index) for term, index in vectorizer.vocabulary_.items()
+                      if term not in stop_words}
+
+        if vectorizer.use_idf:
+            idf = np.asarray(vectorizer.idf_, dtype=vectorizer.dtype)
+        else:
+            idf = None
+
+        return cls(vocabulary, idf, vectorizer.token_pattern,
+                   lowercase=vectorizer.lowercase, norm=vectorizer.norm,
+                   sublinear_tf=vectorizer.sublinear_tf,
+                   binary=vectorizer.binary,
+                   dtype=vectorizer.dtype,
+                   n_features=len(vectorizer.vocabulary_))
+
+    def token_counts(self, raw_documents):
+        """Return (ids, counts, lengths) for the distinct tokens of each document
+
+        ids holds the vocabulary id of each distinct token (-1 if unknown),
+        counts how often it occurs and lengths how many distinct tokens each
+        document has. On the ASCII path single-character tokens are included
+        as unknown tokens.
+        """
+        if isinstance(raw_documents, str):
+            raise ValueError("Iterable over raw text documents expected, string object received.")
+
+        findall = self.token_pattern.findall
+        lowercase = self.lowercase
+        table = self.ascii_table
+        tokens = []
+        counts = []
+        lengths = []
+        for doc in raw_documents:
+            if table is not None and doc.isascii():
+                found = Counter(doc.encode('ascii').translate(table).split())
+            else:
+                found = Counter(findall(doc.lower() if lowercase else doc))
+            lengths.append(len(found))
+            tokens += found.keys()
+            counts += found.values()
+
+        ids = np.fromiter(map(self._lookup.get, tokens, repeat(-1)),
+                          dtype=np.int64, count=len(tokens))
+        return (ids, np.asarray(counts, dtype=np.int64),
+                np.asarray(lengths, dtype=np.int64))
+
+    def transform(self, raw_documents):
+        """Return the TF-IDF matrix for a batch of documents"""
+        ids, counts, lengths = self.token_counts(raw_documents)
+        n_docs = len(lengths)
+        n_features = self.n_features
+
+        # Drop out-of-vocabulary tokens, then sort the remaining (row, id)
+        # pairs into CSR order.
+        rows = np.repeat(np.arange(n_docs, dtype=np.int64), lengths)
+        known = ids >= 0
+        keys = rows[known] * n_features + ids[known]
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+
+        index_dtype = np.int32 if n_features * n_docs < np.iinfo(np.int32).max else np.int64
+        indices = (keys % n_features).astype(index_dtype)
+        indptr = np.zeros(n_docs + 1, dtype=index_dtype)
+        np.cumsum(np.bincount(keys // n_features, minlength=n_docs), out=indptr[1:])
+
+        return self.weight_counts(counts[known][order], indices, indptr)
+
+    def weight_counts(self, counts, indices, indptr):
+        """Turn raw term counts in CSR form into TF-IDF features"""
+        data = counts.astype(self.dtype)
+        if self.binary:
+            data.fill(1)
+        if self.sublinear_tf:
+            np.log(data, data)
+            data += 1.0
+        if self.idf is not None:
+            data *= self.idf[indices]
+        if self.norm is not None:
+            self._normalize(data, indptr)
+
+        return sp.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, self.n_features))
+
+    def _normalize(self, data, indptr):
+        row_sizes = np.diff(indptr)
+        non_empty = row_sizes > 0
+        if not non_empty.any():
+            return
+        values = np.abs(data) if self.norm == 'l1' else data * data
+        norms = np.add.reduceat(values, indptr[:-1][non_empty])
+        if self.norm == 'l2':
+            np.sqrt(norms, norms)
+        norms[norms == 0.0] = 1.0
+        data /= np.repeat(norms, row_sizes[non_empty])
+
+
+def build_fast_vectorizer(vectorizer):
+    """Return a FastVectorizer for this vectorizer, or None if it is not supported"""
+    if vectorizer is None:
+        return None
+    try:
+        return FastVectorizer.from_vectorizer(vectorizer)
+    except (ValueError, AttributeError):
+        return None
+
+
+def check_parity(vectorizer, texts, fast=None):
+    """Compare FastVectorizer output with vectorizer.transform, return max abs difference"""
+    fast = fast or FastVectorizer.from_vectorizer(vectorizer)
+    expected = sp.csr_matrix(vectorizer.transform(texts))
+    expected.sort_indices()
+    actual = fast.transform(texts)
+
+    if expected.shape != actual.shape:
+        raise AssertionError(f"Shape mismatch: {expected.shape} != {actual.shape}")
+    if not (np.array_equal(expected.indptr, actual.indptr)
+            and np.array_equal(expected.indices, actual.indices)):
+        raise AssertionError("Sparsity pattern differs from the fitted vectorizer")
+    if expected.dtype != actual.dtype:
+        raise AssertionError(f"Dtype mismatch: {expected.dtype} != {actual.dtype}")
+
+    max_diff = float(np.max(np.abs(expected.data - actual.data))) if expected.nnz else 0.0
+    tolerance = 1e-12 if actual.dtype == np.float64 else 1e-6
+    if not np.allclose(expected.data, actual.data, rtol=tolerance, atol=tolerance):
+        raise AssertionError(f"Feature values differ (max abs diff {max_diff})")
+    return max_diff
+
+
+def benchmark(vectorizer, texts, repeats=5):
+    """Return (sklearn seconds, fast seconds) for transforming texts"""
+    fast = FastVectorizer.from_vectorizer(vectorizer)
+    timings = []
+    for transform in (vectorizer.transform, fast.transform):
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            transform(texts)
+            best = min(best, time.perf_counter() - start)
+        timings.append(best)
+    return tuple(timings)
+
+
+# Vectorizer settings the fast path must reproduce exactly
+PARITY_CONFIGS = [
+    {},
+    {'binary': True},
+    {'sublinear_tf': True},
+    {'use_idf': False},
+    {'norm': 'l1'},
+    {'norm': None},
+    {'dtype': np.float32},
+    {'lowercase': False},
+    {'binary': True, 'norm': None, 'use_idf': False},
+    {'sublinear_tf': True, 'norm': 'l1', 'dtype': np.float32},
+    {'stop_words': None, 'max_features': None},
+]
+
+
+def parity_suite(texts, samples=None, configs=PARITY_CONFIGS):
+    """Fit a vectorizer for every config and check FastVectorizer against it
+
+    samples defaults to texts plus empty, whitespace-only, unknown-only and
+    non-ASCII documents. Returns {config: max abs diff}; raises
+    AssertionError on the first mismatch.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    if samples is None:
+        samples = list(texts) + ["", "   ", "zzz qqq", "THE AND OF",
+                                 "Café déjà-vu: BREAKING_news a1 b", "Ünïcödé ŁÓDŹ ñandú 東京 news"]
+    results = {}
+    for config in PARITY_CONFIGS if configs is None else configs:
+        params = {'max_features': 1000, 'stop_words': 'english'}
+        params.update(config)
+        vectorizer = TfidfVectorizer(**params).fit(texts)
+        try:
+            results[repr(config)] = check_parity(vectorizer, samples)
+        except AssertionError as e:
+            raise AssertionError(f"{config}: {e}") from None
+    return results
+
+
+if __name__ == "__main__":
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    print("⚡ FAST VECTORIZER PARITY CHECK")
+    print("=" * 50)
+
+    data = pd.read_csv('dataset.csv')
+    texts = data['text'].tolist()
+    vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+    vectorizer.fit(texts)
+
+    # Long articles built from the dataset, plus empty and unknown-only docs
+    long_articles = [" ".join(texts[i:] + texts[:i]) * 200 for i in range(len(texts))]
+    samples = texts + long_articles + ["", "zzz qqq", "THE AND OF", "Café déjà-vu: BREAKING_news a1 b"]
+
+    max_diff = check_parity(vectorizer, samples)
+    print(f"✅ Features match the fitted vectorizer (max abs diff {max_diff:.2e})")
+
+    for config, config_diff in parity_suite(texts + long_articles[:3]).items():
+        print(f"✅ {config:55} max abs diff {config_diff:.2e}")
+
+    sklearn_time, fast_time = benchmark(vectorizer, long_articles)
+    print(f"🐢 sklearn transform: {sklearn_time * 1000:.1f} ms")
+    print(f"⚡ fast transform:    {fast_time * 1000:.1f} ms")
+    print(f"🚀 Speedup: {sklearn_time / fast_time:.1f}x")
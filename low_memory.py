@@ -0,0 +1,223 @@
+# low_memory.py
+# FLOAT32 LOW-MEMORY MODE AND MEMORY FOOTPRINT REPORT
+import copy
+import sys
+
+import numpy as np
+import scipy.sparse as sp
+
+# Labels are stored as small integer codes and only mapped back to
+# 'real'/'fake' when results are shown or written out.
+LABELS = np.array(['real', 'fake'], dtype=object)
+LABEL_CODES = {'real': 0, 'fake': 1}
+
+
+def encode_labels(labels):
+    """Map 'real'/'fake' labels to int8 codes"""
+    return np.fromiter((LABEL_CODES[label] for label in labels), dtype=np.int8)
+
+
+def decode_labels(values):
+    """Map int codes back to 'real'/'fake'; string labels pass through unchanged"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        return LABELS[values]
+    return values
+
+
+def fake_column(classes):
+    """Index of the fake class in a model's classes_, whether it holds names or codes"""
+    classes = list(classes)
+    return classes.index('fake') if 'fake' in classes else classes.index(LABEL_CODES['fake'])
+
+
+def set_idf_dtype(vectorizer, dtype):
+    """Store a fitted TfidfVectorizer's IDF weights in dtype, in place
+
+    Before scikit-learn 1.5 the weights live in a diagonal matrix and the
+    idf_ setter always casts to float64, so the matrix is rebuilt directly.
+    """
+    transformer = vectorizer._tfidf
+    idf = np.asarray(vectorizer.idf_, dtype=dtype)
+    if hasattr(transformer, '_idf_diag'):
+        n_features = len(idf)
+        transformer._idf_diag = sp.diags(idf, offsets=0, shape=(n_features, n_features),
+                                         format='csr', dtype=dtype)
+    else:
+        transformer.idf_ = idf
+
+
+def compact_vectorizer(vectorizer):
+    """Switch a fitted TfidfVectorizer to float32 output, in place"""
+    vectorizer.dtype = np.float32
+    if vectorizer.use_idf:
+        set_idf_dtype(vectorizer, np.float32)
+    # Every term pruned by max_features/min_df; only kept for introspection
+    if hasattr(vectorizer, 'stop_words_'):
+        del vectorizer.stop_words_
+    return vectorizer
+
+
+def compact_model(model):
+    """Keep a fitted linear model's weights in float32 and its classes as codes, in place"""
+    model.coef_ = model.coef_.astype(np.float32)
+    model.intercept_ = model.intercept_.astype(np.float32)
+    if model.classes_.dtype.kind not in 'iu':
+        # Same order as before, so predict_proba columns keep their meaning
+        model.classes_ = encode_labels(model.classes_)
+    return model
+
+
+def compact_features(X):
+    """float32 data and int32 indices for a CSR feature matrix"""
+    X = sp.csr_matrix(X, dtype=np.float32)
+    if X.nnz < np.iinfo(np.int32).max and X.shape[1] < np.iinfo(np.int32).max:
+        X.indices = X.indices.astype(np.int32, copy=False)
+        X.indptr = X.indptr.astype(np.int32, copy=False)
+    return X
+
+
+def encode_indicators(indicator_lists, names):
+    """Pack lists of matched indicator names into one bitmask per article"""
+    bits = {name: 1 << position for position, name in enumerate(names)}
+    dtype = np.uint16 if len(names) <= 16 else np.uint64
+    return np.fromiter((sum(bits[name] for name in found) for found in indicator_lists),
+                       dtype=dtype)
+
+
+# --- Memory report -------------------------------------------------------
+
+def _deep_size(obj):
+    """Approximate bytes held by plain Python containers of strings/numbers"""
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_deep_size(k) + _deep_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(_deep_size(item) for item in obj)
+    if isinstance(obj, np.ndarray):
+        size = obj.nbytes
+        if obj.dtype == object:
+            size += sum(sys.getsizeof(item) for item in obj.ravel())
+        return size
+    return sys.getsizeof(obj)
+
+
+def vectorizer_memory(vectorizer):
+    sizes = {'vocabulary_': _deep_size(vectorizer.vocabulary_)}
+    if vectorizer.use_idf:
+        sizes['idf_'] = np.asarray(vectorizer.idf_).nbytes
+    if getattr(vectorizer, 'stop_words_', None) is not None:
+        sizes['stop_words_'] = _deep_size(vectorizer.stop_words_)
+    return sizes
+
+
+def model_memory(model):
+    return {
+        'coef_': model.coef_.nbytes,
+        'intercept_': model.intercept_.nbytes,
+        'classes_': _deep_size(model.classes_)
+    }
+
+
+def batch_memory(X, labels, indicators):
+    """Bytes held by one scored batch: features, labels and indicator matches"""
+    sizes = {
+        'features.data': X.data.nbytes,
+        'features.indices': X.indices.nbytes,
+        'features.indptr': X.indptr.nbytes
+    }
+    if hasattr(labels, 'memory_usage'):
+        sizes['labels'] = int(labels.memory_usage(deep=True))
+    else:
+        sizes['labels'] = _deep_size(labels)
+    # Indicator lists reference shared constant strings, count only the lists
+    if isinstance(indicators, np.ndarray):
+        sizes['indicators'] = indicators.nbytes
+    else:
+        sizes['indicators'] = sum(sys.getsizeof(found) for found in indicators) + sys.getsizeof(indicators)
+    return sizes
+
+
+def memory_report(detector, texts, labels):
+    """Memory held by the vectorizer, the model and one batch, standard vs low-memory"""
+    import pandas as pd
+
+    standard_vectorizer = copy.deepcopy(detector.vectorizer)
+    standard_vectorizer.dtype = np.float64
+    if standard_vectorizer.use_idf:
+        set_idf_dtype(standard_vectorizer, np.float64)
+    standard_model = copy.deepcopy(detector.model)
+    standard_model.coef_ = standard_model.coef_.astype(np.float64)
+    standard_model.intercept_ = standard_model.intercept_.astype(np.float64)
+
+    low_vectorizer = compact_vectorizer(copy.deepcopy(detector.vectorizer))
+    low_model = compact_model(copy.deepcopy(detector.model))
+
+    indicator_lists = [[word for word in detector.FAKE_INDICATORS if word in text.lower()]
+                       for text in texts]
+    standard_X = sp.csr_matrix(standard_vectorizer.transform(texts))
+
+    from fast_vectorizer import build_fast_vectorizer
+    fast = build_fast_vectorizer(low_vectorizer)
+    low_X = compact_features(fast.transform(texts) if fast is not None else low_vectorizer.transform(texts))
+
+    return {
+        'standard': {
+            'vectorizer': vectorizer_memory(standard_vectorizer),
+            'model': model_memory(standard_model),
+            'batch': batch_memory(standard_X, pd.Series(list(labels), dtype=object), indicator_lists)
+        },
+        'low_memory': {
+            'vectorizer': vectorizer_memory(low_vectorizer),
+            'model': model_memory(low_model),
+            'batch': batch_memory(low_X, encode_labels(labels),
+                                  encode_indicators(indicator_lists, detector.FAKE_INDICATORS))
+        }
+    }
+
+
+def print_memory_report(report):
+    def kb(size):
+        return f"{size / 1024:10.1f} KB"
+
+    print("\n🧠 MEMORY FOOTPRINT REPORT")
+    print("=" * 60)
+    print(f"{'component':28}{'standard':>15}{'low memory':>15}")
+    totals = {'standard': 0, 'low_memory': 0}
+    for part in ('vectorizer', 'model', 'batch'):
+        print(f"\n{part.upper()}")
+        for name, standard_size in report['standard'][part].items():
+            low_size = report['low_memory'][part].get(name, 0)
+            totals['standard'] += standard_size
+            totals['low_memory'] += low_size
+            print(f"  {name:26}{kb(standard_size):>15}{kb(low_size):>15}")
+    saved = totals['standard'] - totals['low_memory']
+    print("\n" + "-" * 60)
+    print(f"{'TOTAL':28}{kb(totals['standard']):>15}{kb(totals['low_memory']):>15}")
+    if totals['standard']:
+        print(f"💾 Low-memory mode saves {kb(saved).strip()} ({saved / totals['standard'] * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    import argparse
+    from app import FakeNewsDetector
+
+    parser = argparse.ArgumentParser(description="Memory footprint of the vectorizer, model and a batch")
+    parser.add_argument('--data', default='dataset.csv', help="CSV or article archive with text and label")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    detector = FakeNewsDetector()
+    if detector.model is None:
+        raise SystemExit(1)
+
+    from article_archive import ArticleArchive, is_archive
+    if is_archive(args.data):
+        with ArticleArchive(args.data) as archive:
+            texts = archive[:args.batch_size]
+            labels = archive.labels(0, args.batch_size)
+    else:
+        import pandas as pd
+        data = pd.read_csv(args.data, nrows=args.batch_size)
+        texts, labels = data['text'].tolist(), data['label'].tolist()
+
+    print_memory_report(memory_report(detector, texts, labels))
@@ -0,0 +1,432 @@
+# shard_runner.py
+# MULTI-NODE SHARDED BATCH SCORING THROUGH A SHARED DIRECTORY
+#
+# Job directory layout:
+#   job.json               shard list and lease settings, written by the coordinator
+#   shards/<name>.csv      input rows of CSV shards (archive shards are ranges in job.json)
+#   claims/<name>.<n>      lease for attempt n; created with O_EXCL so exactly one
+#                          worker owns each attempt, its mtime is the heartbeat
+#   outputs/<name>.csv     results, published with an atomic rename
+#   failed/<name>.json     shards whose attempts were all used up
+#
+# A claim whose heartbeat is older than lease_ttl belongs to a crashed worker;
+# the next worker takes attempt n + 1. With the default max_attempts=2 a
+# crashed shard is retried exactly once. Lease expiry compares file mtimes
+# with the local clock, so lease_ttl must be well above clock skew between hosts.
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+
+import pandas as pd
+
+JOB_FILE = 'job.json'
+
+
+def _write_atomic(path, write):
+    """Write through a temporary file in the same directory, then rename into place"""
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_json(path, data):
+    def write(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+    _write_atomic(path, write)
+
+
+# --- Coordinator ---------------------------------------------------------
+
+def create_job(job_dir, inputs, shard_size=10000, lease_ttl=120, heartbeat=None, max_attempts=2):
+    """Split input CSVs / article archives into shards in a new job directory"""
+    from article_archive import ArticleArchive, is_archive
+
+    for sub in ('shards', 'claims', 'outputs', 'failed'):
+        os.makedirs(os.path.join(job_dir, sub), exist_ok=True)
+
+    shards = []
+    for source in inputs:
+        stem = os.path.splitext(os.path.basename(source))[0]
+        if is_archive(source):
+            with ArticleArchive(source) as archive:
+                count = len(archive)
+            for start in range(0, count, shard_size):
+                shards.append({'name': f"{stem}-{len(shards):05d}", 'archive': os.path.abspath(source),
+                               'source': os.path.abspath(source),
+                               'start': start, 'stop': min(start + shard_size, count)})
+        else:
+            start = 0
+            for chunk in pd.read_csv(source, chunksize=shard_size):
+                name = f"{stem}-{len(shards):05d}"
+                path = os.path.join('shards', f"{name}.csv")
+                _write_atomic(os.path.join(job_dir, path),
+                              lambda tmp_path: chunk[['text']].to_csv(tmp_path, index=False))
+                shards.append({'name': name, 'csv': path, 'source': os.path.abspath(source),
+                               'start': start, 'stop': start + len(chunk)})
+                start += len(chunk)
+
+    _write_json(os.path.join(job_dir, JOB_FILE), {
+        'shards': shards,
+        'lease_ttl': lease_ttl,
+        'heartbeat': heartbeat or lease_ttl / 4,
+        'max_attempts': max_attempts
+    })
+    return shards
+
+
+def load_job(job_dir):
+    with open(os.path.join(job_dir, JOB_FILE)) as f:
+        return json.load(f)
+
+
+def _claims(job_dir):
+    """{shard name: [(attempt, mtime), ...]} for all claim files"""
+    claims = {}
+    claims_dir = os.path.join(job_dir, 'claims')
+    for entry in os.scandir(claims_dir):
+        name, _, attempt = entry.name.rpartition('.')
+        if not attempt.isdigit():
+            continue
+        try:
+            mtime = entry.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        claims.setdefault(name, []).append((int(attempt), mtime))
+    return claims
+
+
+def job_status(job_dir):
+    """Return {'done', 'running', 'expired', 'pending', 'failed'} lists of shard names"""
+    job = load_job(job_dir)
+    claims = _claims(job_dir)
+    now = time.time()
+    status = {'done': [], 'running': [], 'expired': [], 'pending': [], 'failed': []}
+    for shard in job['shards']:
+        name = shard['name']
+        if os.path.exists(os.path.join(job_dir, 'outputs', f"{name}.csv")):
+            status['done'].append(name)
+        elif os.path.exists(os.path.join(job_dir, 'failed', f"{name}.json")):
+            status['failed'].append(name)
+        elif name not in claims:
+            status['pending'].append(name)
+        elif now - max(claims[name])[1] < job['lease_ttl']:
+            status['running'].append(name)
+        else:
+            status['expired'].append(name)
+    return status
+
+
+def merge_outputs(job_dir, out_path):
+    """Concatenate the shard outputs in shard order"""
+    job = load_job(job_dir)
+    parts = [pd.read_csv(os.path.join(job_dir, 'outputs', f"{shard['name']}.csv"))
+             for shard in job['shards']
+             if os.path.exists(os.path.join(job_dir, 'outputs', f"{shard['name']}.csv"))]
+    merged = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    merged.to_csv(out_path, index=False)
+    return len(merged)
+
+
+# --- Worker --------------------------------------------------------------
+
+class Lease:
+    """Ownership of one attempt at a shard, kept alive by a heartbeat thread"""
+
+    def __init__(self, job_dir, name, attempt, worker_id, interval):
+        self.job_dir = job_dir
+        self.name = name
+        self.attempt = attempt
+        self.path = os.path.join(job_dir, 'claims', f"{name}.{attempt}")
+        self.worker_id = worker_id
+        self.interval = interval
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+
+    @classmethod
+    def acquire(cls, job_dir, name, attempt, worker_id, interval):
+        """Create the claim file for this attempt; returns None if another worker got it"""
+        lease = cls(job_dir, name, attempt, worker_id, interval)
+        try:
+            fd = os.open(lease.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return None
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'worker': worker_id, 'host': socket.gethostname(), 'pid': os.getpid(),
+                       'acquired': time.time()}, f)
+        lease._thread.start()
+        return lease
+
+    def superseded(self):
+        """True once a later attempt has been claimed, i.e. this lease expired"""
+        return os.path.exists(os.path.join(self.job_dir, 'claims', f"{self.name}.{self.attempt + 1}"))
+
+    def _beat(self):
+        while not self._stop.wait(self.interval):
+            if self.superseded():
+                self.lost.set()
+                return
+            now = time.time()
+            os.utime(self.path, (now, now))
+
+    def release(self):
+        self._stop.set()
+        self._thread.join()
+
+    def expire(self):
+        """Give the attempt up now instead of waiting for the lease to time out"""
+        self.release()
+        os.utime(self.path, (0, 0))
+
+
+def _read_shard(job_dir, shard):
+    if 'archive' in shard:
+        from article_archive import ArticleArchive
+        with ArticleArchive(shard['archive']) as archive:
+            return archive.get_range(shard['start'], shard['stop'])
+    return pd.read_csv(os.path.join(job_dir, shard['csv']))['text'].fillna('').astype(str).tolist()
+
+
+def score_shard(detector, job_dir, shard, lease, batch_size=1024):
+    """Score one shard and publish its output, unless the lease was lost meanwhile"""
+    texts = _read_shard(job_dir, shard)
+    predictions = []
+    confidences = []
+    for start in range(0, len(texts), batch_size):
+        if lease.lost.is_set():
+            return False
+        batch_predictions, batch_confidences = detector.predict_batch(texts[start:start + batch_size])
+        predictions.extend(batch_predictions)
+        confidences.extend(batch_confidences)
+
+    if lease.lost.is_set() or lease.superseded():
+        return False
+    results = pd.DataFrame({
+        'source': os.path.basename(shard['source']),
+        'id': range(shard['start'], shard['start'] + len(texts)),
+        'prediction': predictions,
+        'confidence': confidences
+    })
+    _write_atomic(os.path.join(job_dir, 'outputs', f"{shard['name']}.csv"),
+                  lambda tmp_path: results.to_csv(tmp_path, index=False))
+    return True
+
+
+def _claim_next(job_dir, job, worker_id):
+    """Claim the first pending or expired shard; returns (shard, lease) or (None, None)"""
+    claims = _claims(job_dir)
+    now = time.time()
+    for shard in job['shards']:
+        name = shard['name']
+        if (os.path.exists(os.path.join(job_dir, 'outputs', f"{name}.csv"))
+                or os.path.exists(os.path.join(job_dir, 'failed', f"{name}.json"))):
+            continue
+        attempts = claims.get(name)
+        if attempts:
+            attempt, heartbeat = max(attempts)
+            if now - heartbeat < job['lease_ttl']:
+                continue
+            if attempt >= job['max_attempts']:
+                _write_json(os.path.join(job_dir, 'failed', f"{name}.json"),
+                            {'attempts': attempt, 'failed_at': now})
+                continue
+            next_attempt = attempt + 1
+        else:
+            next_attempt = 1
+        lease = Lease.acquire(job_dir, name, next_attempt, worker_id, job['heartbeat'])
+        if lease is not None:
+            return shard, lease
+    return None, None
+
+
+def run_worker(job_dir, detector, worker_id=None, batch_size=1024, poll_interval=None):
+    """Claim and score shards until every shard is done or failed"""
+    job = load_job(job_dir)
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    poll_interval = poll_interval if poll_interval is not None else job['heartbeat']
+    scored = 0
+
+    while True:
+        shard, lease = _claim_next(job_dir, job, worker_id)
+        if shard is None:
+            status = job_status(job_dir)
+            if not (status['pending'] or status['running'] or status['expired']):
+                return scored
+            # Others hold the remaining shards; wait in case one of them dies
+            time.sleep(poll_interval)
+            continue
+
+        print(f"⚙️  [{worker_id}] scoring {shard['name']} (attempt {lease.attempt})")
+        try:
+            if score_shard(detector, job_dir, shard, lease, batch_size):
+                scored += 1
+                print(f"✅ [{worker_id}] {shard['name']} done")
+            else:
+                print(f"⚠️  [{worker_id}] lost lease on {shard['name']}, dropping results")
+        except Exception:
+            # A bad shard uses up an attempt like a crash, but must not take
+            # the worker down with it
+            error = traceback.format_exc()
+            print(f"❌ [{worker_id}] {shard['name']} failed on attempt {lease.attempt}:\n{error}")
+            if lease.attempt >= job['max_attempts']:
+                _write_json(os.path.join(job_dir, 'failed', f"{shard['name']}.json"),
+                            {'attempts': lease.attempt, 'worker': worker_id,
+                             'failed_at': time.time(), 'traceback': error})
+            lease.expire()
+        finally:
+            lease.release()
+
+
+
+# --- Self test -----------------------------------------------------------
+
+def _claim_and_die(job_dir):
+    """Claim the first shard, then exit without releasing it, like a killed worker"""
+    shard, _ = _claim_next(job_dir, load_job(job_dir), 'crashed-worker')
+    print(f"💥 crashed-worker claimed {shard['name']} and died", flush=True)
+    os._exit(1)
+
+
+def selftest(n_workers=3, articles=600, shard_size=50, lease_ttl=3, keep=False):
+    """Run worker processes against a temporary job with one crash and one broken shard
+
+    Checks that every good shard has exactly one output, that only the
+    crashed and broken shards were attempted twice, and that the broken
+    shard ends in failed/ with its traceback while all workers exit cleanly.
+    Workers load the trained model from the current directory.
+    """
+    import multiprocessing
+    import subprocess
+    import sys
+    import tempfile
+
+    root = tempfile.mkdtemp(prefix='shard_selftest_')
+    job_dir = os.path.join(root, 'job')
+    source = os.path.join(root, 'articles.csv')
+    pd.DataFrame({'text': [f"Article {i}: breaking report on topic {i % 7} from official sources"
+                           for i in range(articles)]}).to_csv(source, index=False)
+    shards = create_job(job_dir, [source], shard_size, lease_ttl=lease_ttl)
+    crashed, broken = shards[0]['name'], shards[-1]['name']
+    # A missing input file makes score_shard raise on every attempt
+    os.remove(os.path.join(job_dir, shards[-1]['csv']))
+
+    crash = multiprocessing.Process(target=_claim_and_die, args=(job_dir,))
+    crash.start()
+    crash.join()
+
+    logs = [open(os.path.join(root, f"worker{i}.log"), 'w') for i in range(n_workers)]
+    workers = [subprocess.Popen([sys.executable, os.path.abspath(__file__), 'work', job_dir,
+                                 '--worker-id', f"worker{i}"], stdout=log, stderr=subprocess.STDOUT)
+               for i, log in enumerate(logs)]
+    exit_codes = [worker.wait() for worker in workers]
+    for log in logs:
+        log.close()
+
+    claims = _claims(job_dir)
+    outputs = set(os.listdir(os.path.join(job_dir, 'outputs')))
+    problems = []
+    if any(exit_codes):
+        problems.append(f"worker exit codes {exit_codes}")
+    for shard in shards:
+        name = shard['name']
+        attempts = sorted(attempt for attempt, _ in claims.get(name, []))
+        expected = [1, 2] if name in (crashed, broken) else [1]
+        if attempts != expected:
+            problems.append(f"{name}: attempts {attempts}, expected {expected}")
+        has_output = f"{name}.csv" in outputs
+        if has_output == (name == broken):
+            problems.append(f"{name}: {'unexpected' if has_output else 'missing'} output")
+    if any(entry.endswith('.tmp') for entry in outputs):
+        problems.append("temporary files left in outputs/")
+    failed_file = os.path.join(job_dir, 'failed', f"{broken}.json")
+    if not os.path.exists(failed_file):
+        problems.append(f"{broken} not marked failed")
+    else:
+        with open(failed_file) as f:
+            if 'FileNotFoundError' not in json.load(f).get('traceback', ''):
+                problems.append(f"{broken}: traceback not recorded")
+
+    merged = os.path.join(root, 'merged.csv')
+    rows = merge_outputs(job_dir, merged)
+    ids = pd.read_csv(merged)['id']
+    expected_rows = articles - (shards[-1]['stop'] - shards[-1]['start'])
+    if rows != expected_rows or ids.duplicated().any():
+        problems.append(f"merged {rows} rows ({ids.duplicated().sum()} duplicates), expected {expected_rows}")
+
+    if not keep and not problems:
+        import shutil
+        shutil.rmtree(root)
+    return problems, root
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sharded batch scoring through a shared directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    create = commands.add_parser('create', help="split inputs into a new job")
+    create.add_argument('job_dir')
+    create.add_argument('inputs', nargs='+', help="CSV files with a 'text' column or article archives")
+    create.add_argument('--shard-size', type=int, default=10000)
+    create.add_argument('--lease-ttl', type=float, default=120, help="seconds without heartbeat before a lease expires")
+    create.add_argument('--max-attempts', type=int, default=2)
+
+    work = commands.add_parser('work', help="claim and score shards")
+    work.add_argument('job_dir')
+    work.add_argument('--worker-id')
+    work.add_argument('--batch-size', type=int, default=1024)
+
+    status_parser = commands.add_parser('status', help="show shard progress")
+    status_parser.add_argument('job_dir')
+
+    merge = commands.add_parser('merge', help="concatenate shard outputs")
+    merge.add_argument('job_dir')
+    merge.add_argument('out')
+
+    test = commands.add_parser('selftest', help="run several workers against a temporary job")
+    test.add_argument('--workers', type=int, default=3)
+    test.add_argument('--keep', action='store_true', help="keep the temporary job directory")
+
+    args = parser.parse_args()
+
+    if args.command == 'create':
+        shards = create_job(args.job_dir, args.inputs, args.shard_size,
+                            lease_ttl=args.lease_ttl, max_attempts=args.max_attempts)
+        print(f"📦 Created job with {len(shards)} shards in '{args.job_dir}'")
+
+    elif args.command == 'work':
+        from app import FakeNewsDetector
+        detector = FakeNewsDetector()
+        if detector.model is None:
+            raise SystemExit(1)
+        scored = run_worker(args.job_dir, detector, worker_id=args.worker_id, batch_size=args.batch_size)
+        print(f"🏁 Worker finished after scoring {scored} shards")
+
+    elif args.command == 'status':
+        for state, names in job_status(args.job_dir).items():
+            print(f"{state:8} {len(names)}")
+
+    elif args.command == 'merge':
+        rows = merge_outputs(args.job_dir, args.out)
+        print(f"💾 Merged {rows} results into '{args.out}'")
+
+    elif args.command == 'selftest':
+        problems, root = selftest(n_workers=args.workers, keep=args.keep)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems or args.keep:
+            print(f"📁 Job directory and worker logs kept in '{root}'")
+        if problems:
+            raise SystemExit(1)
+        print(f"✅ {args.workers} workers: crashed shard retried once, broken shard failed cleanly,"
+              " every other shard scored exactly once")
@@ -8,19 +8,30 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score
 import joblib
 import os
+from article_archive import ArticleArchive, is_archive
+from parallel_tfidf import parallel_fit_transform
+from low_memory import compact_features, compact_model, compact_vectorizer, encode_labels
+from ensemble import ENSEMBLE_FILE, fit_ensemble, member_accuracies
 
 print("🚀 TRAINING AI MODEL FOR FAKE NEWS DETECTION...")
 print("=" * 50)
 
-def train_fake_news_model():
+def load_dataset(source):
+    """Load texts and labels from a CSV file or an article archive"""
+    if is_archive(source):
+        with ArticleArchive(source) as archive:
+            return pd.DataFrame({'text': archive[:], 'label': archive.labels()})
+    return pd.read_csv(source)
+
+def train_fake_news_model(source='dataset.csv', n_jobs=1, low_memory=False, ensemble=False):
     # Check if dataset exists
-    if not os.path.exists('dataset.csv'):
-        print("❌ dataset.csv not found! Please create the dataset first.")
+    if not os.path.exists(source):
+        print(f"❌ {source} not found! Please create the dataset first.")
         return None
     
     # Load dataset
     print("📊 Loading dataset...")
-    data = pd.read_csv('dataset.csv')
+    data = load_dataset(source)
     print(f"Dataset loaded: {len(data)} samples")
     
     # Prepare features and labels
@@ -31,10 +42,23 @@ def train_fake_news_model():
     print(f"Real news: {sum(y == 'real')}")
     print(f"Fake news: {sum(y == 'fake')}")
     
+    if low_memory:
+        # int8 label codes instead of an object Series of strings
+        print("🪶 Low-memory mode: float32 features and weights")
+        y = encode_labels(y)
+    
     # Convert text to numerical features using TF-IDF
     print("\n🔧 Converting text to features...")
-    vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-    X_features = vectorizer.fit_transform(X)
+    vectorizer = TfidfVectorizer(max_features=1000, stop_words='english',
+                                 dtype=np.float32 if low_memory else np.float64)
+    if n_jobs == 1:
+        X_features = vectorizer.fit_transform(X)
+    else:
+        print(f"⚙️  Fitting features in parallel ({n_jobs or os.cpu_count()} workers)...")
+        X_features = parallel_fit_transform(vectorizer, X, n_jobs=n_jobs)
+    if low_memory:
+        compact_vectorizer(vectorizer)
+        X_features = compact_features(X_features)
     
     # Split data into training and testing
     X_train, X_test, y_train, y_test = train_test_split(
@@ -42,9 +66,16 @@ def train_fake_news_model():
     )
     
     # Train AI model
-    print("🤖 Training AI model...")
-    model = LogisticRegression()
-    model.fit(X_train, y_train)
+    if ensemble:
+        # All members are fitted on the same feature matrix
+        print("🤖 Training ensemble (logistic regression, naive Bayes, linear SVM)...")
+        model = fit_ensemble(X_train, y_train)
+    else:
+        print("🤖 Training AI model...")
+        model = LogisticRegression()
+        model.fit(X_train, y_train)
+    if low_memory:
+        compact_model(model)
     
     # Test model accuracy
     y_pred = model.predict(X_test)
@@ -52,17 +83,37 @@ def train_fake_news_model():
     
     print(f"\n✅ Model Training Complete!")
     print(f"📊 Accuracy: {accuracy * 100:.2f}%")
+    if ensemble:
+        for name, member_accuracy in member_accuracies(model, X_test, y_test).items():
+            print(f"   {name}: {member_accuracy * 100:.2f}%")
     
     # Save model and vectorizer
-    joblib.dump(model, 'fake_news_model.pkl')
-    joblib.dump(vectorizer, 'vectorizer.pkl')
-    
-    print("💾 Model saved as 'fake_news_model.pkl'")
-    print("💾 Vectorizer saved as 'vectorizer.pkl'")
+    if ensemble:
+        # One artifact, so members and vectorizer can never get out of sync
+        joblib.dump({'model': model, 'vectorizer': vectorizer}, ENSEMBLE_FILE)
+        print(f"💾 Ensemble and vectorizer saved as '{ENSEMBLE_FILE}'")
+    else:
+        joblib.dump(model, 'fake_news_model.pkl')
+        joblib.dump(vectorizer, 'vectorizer.pkl')
+        
+        print("💾 Model saved as 'fake_news_model.pkl'")
+        print("💾 Vectorizer saved as 'vectorizer.pkl'")
     
     return model, vectorizer
 
 # Train model when script runs
 if __name__ == "__main__":
-    train_fake_news_model()
+    import argparse
+    parser = argparse.ArgumentParser(description="Train the fake news model")
+    parser.add_argument('source', nargs='?', default='dataset.csv',
+                        help="CSV file or article archive with text and label")
+    parser.add_argument('--n-jobs', type=int, default=1,
+                        help="worker processes for feature fitting (0 = all cores)")
+    parser.add_argument('--low-memory', action='store_true',
+                        help="float32 features/weights and integer label codes")
+    parser.add_argument('--ensemble', action='store_true',
+                        help="train logistic regression, naive Bayes and a linear SVM together")
+    args = parser.parse_args()
+    train_fake_news_model(args.source, n_jobs=args.n_jobs or None, low_memory=args.low_memory,
+                          ensemble=args.ensemble)
     print("\n🎉 Training completed! Now run 'app.py'")
\ No newline at end of file
@@ -0,0 +1,159 @@
+# triage.py
+# STREAMING TOP-K TRIAGE QUEUE FOR THE MOST SUSPICIOUS ARTICLES
+import heapq
+import itertools
+import json
+
+
+class TriageQueue:
+    """Keep the k articles with the highest fake probability, optionally per group.
+
+    Each group holds a min-heap of at most k entries, so memory stays O(k)
+    per group however long the stream is. Queues from parallel workers can
+    be combined with merge().
+    """
+
+    def __init__(self, k, group_by=None):
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.k = k
+        self.group_by = group_by
+        self.seen = 0
+        self._heaps = {}
+        # Tie-breaker so equal scores never compare the articles themselves
+        self._order = itertools.count()
+
+    def push(self, score, article, group=None):
+        """Offer one scored article to the queue"""
+        self.seen += 1
+        if group is None and self.group_by is not None:
+            group = self.group_by(article)
+        self._offer(group, score, article)
+
+    def _offer(self, group, score, article):
+        heap = self._heaps.setdefault(group, [])
+        entry = (float(score), -next(self._order), article)
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+        elif entry[0] > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+
+    def push_batch(self, scores, articles):
+        for score, article in zip(scores, articles):
+            self.push(score, article)
+
+    def threshold(self, group=None):
+        """Lowest score still in the queue for a group (0 while it is not full)"""
+        heap = self._heaps.get(group, [])
+        return heap[0][0] if len(heap) == self.k else 0.0
+
+    def snapshot(self):
+        """Return {group: [(score, article), ...]} sorted most suspicious first"""
+        return {group: [(score, article) for score, _, article in sorted(heap, reverse=True)]
+                for group, heap in self._heaps.items()}
+
+    def top(self, group=None):
+        """Sorted (score, article) list for one group (the only group when ungrouped)"""
+        return self.snapshot().get(group, [])
+
+    def merge(self, other):
+        """Fold another queue (e.g. from a parallel worker) into this one"""
+        for group, heap in other._heaps.items():
+            for score, _, article in heap:
+                self._offer(group, score, article)
+        self.seen += other.seen
+        return self
+
+    def to_dict(self):
+        """JSON-friendly form of the queue, for shipping partial results"""
+        return {
+            'k': self.k,
+            'seen': self.seen,
+            'groups': [{'group': group, 'items': [[score, article] for score, article in items]}
+                       for group, items in self.snapshot().items()]
+        }
+
+    @classmethod
+    def from_dict(cls, data, group_by=None):
+        queue = cls(data['k'], group_by=group_by)
+        for entry in data['groups']:
+            for score, article in entry['items']:
+                queue._offer(entry['group'], score, article)
+        queue.seen = data['seen']
+        return queue
+
+
+def merge_queues(queues):
+    """Combine partial top-k queues into one"""
+    queues = list(queues)
+    merged = TriageQueue(queues[0].k, group_by=queues[0].group_by)
+    for queue in queues:
+        merged.merge(queue)
+    return merged
+
+
+def triage_stream(detector, articles, k=200, group_by=None, batch_size=256, text_key='text'):
+    """Score a stream of articles and keep the top-k by fake probability
+
+    articles can be plain strings or dicts holding the text under text_key.
+    Only one batch of articles is held in memory besides the queue itself.
+    """
+    queue = TriageQueue(k, group_by=group_by)
+    articles = iter(articles)
+    while True:
+        batch = list(itertools.islice(articles, batch_size))
+        if not batch:
+            break
+        texts = [article if isinstance(article, str) else article[text_key] for article in batch]
+        queue.push_batch(detector.predict_fake_proba(texts), batch)
+    return queue
+
+
+def iter_csv_articles(path, chunksize=10000, text_key='text'):
+    """Yield rows of a CSV as dicts without loading the whole file"""
+    import pandas as pd
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        # Blank text cells read as NaN; the other columns are kept as they are
+        chunk[text_key] = chunk[text_key].fillna('').astype(str)
+        yield from chunk.to_dict('records')
+
+
+def iter_archive_articles(path):
+    """Yield {'id', 'text'} dicts from an article archive"""
+    from article_archive import ArticleArchive
+    with ArticleArchive(path) as archive:
+        for article_id, text in enumerate(archive):
+            yield {'id': article_id, 'text': text}
+
+
+if __name__ == "__main__":
+    import argparse
+    from app import FakeNewsDetector
+    from article_archive import is_archive
+
+    parser = argparse.ArgumentParser(description="Find the most suspicious articles in a feed")
+    parser.add_argument('feed', help="CSV with a 'text' column, or an article archive")
+    parser.add_argument('--k', type=int, default=200, help="articles to keep per group")
+    parser.add_argument('--group-by', help="column to keep a separate top-k for, e.g. source")
+    parser.add_argument('--out', default='triage_queue.json')
+    args = parser.parse_args()
+
+    detector = FakeNewsDetector()
+    if detector.model is None:
+        raise SystemExit(1)
+
+    group_by = (lambda article: article.get(args.group_by)) if args.group_by else None
+    articles = iter_archive_articles(args.feed) if is_archive(args.feed) else iter_csv_articles(args.feed)
+    queue = triage_stream(detector, articles, k=args.k, group_by=group_by)
+
+    with open(args.out, 'w') as f:
+        json.dump(queue.to_dict(), f, indent=2, default=str)
+
+    print(f"\n📥 Articles scored: {queue.seen}")
+    for group, items in queue.snapshot().items():
+        label = group if group is not None else 'all'
+        print(f"\n🚨 TOP {len(items)} SUSPICIOUS ({label}):")
+        for score, article in items[:10]:
+            text = article if isinstance(article, str) else article['text']
+            print(f"   {score * 100:5.1f}%  {text[:70]}")
+    print(f"\n💾 Queue saved as '{args.out}'")